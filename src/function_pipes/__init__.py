@@ -8,5 +8,7 @@ import sys
 
 if sys.version_info >= (3, 10):
     from .with_paramspec.function_pipes import *
+    from .with_paramspec.function_pipes import __all__
 else:
     from .without_paramspec.function_pipes import *
+    from .without_paramspec.function_pipes import __all__
@@ -0,0 +1,74 @@
+"""
+Precompile the functions in a module that use fast_pipes.
+
+    python -m function_pipes.precompile mymodule
+
+This imports the module, and writes the rewritten functions to
+`mymodule.fastpipes` next to the source file.
+When the module is imported later, fast_pipes loads the rewritten
+functions from there rather than reading and transforming the source.
+
+Each function's source is checked against a hash stored in the file,
+and functions that have changed since the file was written
+are compiled from source as usual, so an out of date file is
+slower but never wrong. The file is specific to the versions of
+Python and function_pipes that wrote it.
+"""
+
+import marshal
+import sys
+from importlib import import_module
+from importlib.util import MAGIC_NUMBER
+from typing import List, Optional
+
+if sys.version_info >= (3, 10):
+    from .with_paramspec import function_pipes as _pipes
+else:
+    from .without_paramspec import function_pipes as _pipes
+
+
+def precompile(module_name: str) -> str:
+    """
+    Import a module and write out the fast_pipes definitions
+    of its functions.
+    Returns the path of the written file.
+    """
+    module = import_module(module_name)
+    filename = module.__file__
+    if filename is None:
+        raise ValueError(f"{module_name} has no source file to precompile")
+
+    definitions = {
+        code.co_firstlineno: (
+            code,
+            source.count("\n"),
+            _pipes._source_hash(source),
+            compiled,
+        )
+        for (code, _), (source, compiled) in _pipes._FAST_PIPE_CACHE.items()
+        if code.co_filename == filename
+    }
+
+    path = _pipes._precompiled_path(filename)
+    with open(path, "wb") as f:
+        marshal.dump((MAGIC_NUMBER, _pipes.__version__, definitions), f)
+
+    # later imports in this process should see the new file
+    _pipes._PRECOMPILED[filename] = definitions
+    return path
+
+
+def main(argv: Optional[List[str]] = None):
+    """
+    Precompile each module named on the command line
+    """
+    module_names = sys.argv[1:] if argv is None else argv
+    if not module_names:
+        print("usage: python -m function_pipes.precompile module [module ...]")
+        sys.exit(2)
+    for module_name in module_names:
+        print(precompile(module_name))
+
+
+if __name__ == "__main__":
+    main()
@@ -13,108 +13,399 @@ Licence: MIT
 """
 # pylint: disable=line-too-long
 
+from __future__ import annotations
+
+import __future__
+import marshal
 from ast import (
+    AST,
+    AsyncFunctionDef,
+    Attribute,
+    BoolOp,
     Call,
+    ClassDef,
+    Compare,
+    Constant,
+    Dict as AstDict,
+    DictComp,
+    FunctionDef,
+    GeneratorExp,
+    IfExp,
+    Index,
     Lambda,
+    ListComp,
     Load,
     Name,
     NamedExpr,
     NodeTransformer,
-    NodeVisitor,
+    SetComp,
+    Starred,
     Store,
+    Subscript,
+    comprehension,
+    copy_location,
     expr,
-    increment_lineno,
+    fix_missing_locations,
+    iter_fields,
     parse,
-    walk,
 )
+from ast import Tuple as AstTuple
+from hashlib import sha256
+from importlib.util import MAGIC_NUMBER
 from inspect import getsource
-from itertools import takewhile
+from itertools import count
+from linecache import checkcache, getlines
+from os.path import splitext
+from sys import intern
 from textwrap import dedent
-from typing import Any, Union, Callable, TypeVar, overload
+from types import CodeType, FunctionType
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    Iterator,
+    Optional,
+    Tuple,
+    Union,
+    Callable,
+    TypeVar,
+    overload,
+)
+
+__version__ = "0.1.2"
+
+__all__ = [
+    "pipe",
+    "pipeline",
+    "pipe_bridge",
+    "fast_pipes",
+    "arbitary_length_pipe",
+    "stand_in_callable",
+    "T",
+    "BridgeType",
+    "InputVal",
+    "Out0",
+    "Out1",
+    "Out2",
+    "Out3",
+    "Out4",
+    "Out5",
+    "Out6",
+    "Out7",
+    "Out8",
+    "Out9",
+    "Out10",
+    "Out11",
+    "Out12",
+    "Out13",
+    "Out14",
+    "Out15",
+    "Out16",
+    "Out17",
+    "Out18",
+    "Out19",
+]
 
 
 T = TypeVar("T")
 
+# Compiler flags for every __future__ feature, used to compile
+# rewritten functions with the features of their own module
+# rather than the ones used here.
+_FUTURE_FLAGS = 0
+for _feature in __future__.all_feature_names:
+    _FUTURE_FLAGS |= getattr(__future__, _feature).compiler_flag
+
+# Expression contexts carry no state, so one of each
+# can be shared between all the nodes that are created.
+_LOAD = Load()
+_STORE = Store()
 
-class _LambdaExtractor(NodeTransformer):
+
+class _LambdaInliner(NodeTransformer):
     """
-    Replace references to the lambda argument with the passed in value
+    Replace references to the lambda argument with the passed in value,
+    counting the references in the same pass.
+
+    If the lambda only uses the argument once, the value can just be
+    substituted for it.
+    e.g. a = pipe(5, lambda x: x + 1)
+    becomes a = 5 + 1
+
+    If the lambda uses the argument more than once, the value has to be
+    assigned to a variable first (using a walrus), and that variable
+    used for the later references.
+    e.g. a = pipe(5, lambda x: x + x + 1)
+    becomes a = (var := 5) + var + 1
+
+    The number of uses isn't known until the body has been visited,
+    so the first reference is given the value, and is swapped for
+    the walrus at the end if a second reference turned up.
+
+    This relies on the first reference being evaluated first, and
+    in the lambda's own scope. If it is somewhere that might be evaluated
+    later or not at all (a nested lambda or comprehension, a branch of
+    a conditional, or after a short circuit), or a walrus is needed
+    where one isn't allowed, the lambda is called rather than inlined.
+    e.g. a = pipe(5, lambda x: x and x + 1)
+    becomes a = (lambda var: var and var + 1)(5)
     """
 
     def __init__(
         self,
         _lambda: Lambda,
         value: Union[expr, Call],
-        subsequent_value: Union[expr, Call, None] = None,
+        temp_name: str,
+        walrus_allowed: bool = True,
     ):
         self._lambda = _lambda
-        self.arg_name = self._lambda.args.args[0].arg  # type: ignore
-        self.visit_count = 0
+        # parsed names are interned, so interning the arg name lets
+        # the comparison in visit_Name succeed on identity alone
+        self.arg_name = intern(self._lambda.args.args[0].arg)  # type: ignore
         self.value = value
-        self.subsequent_value = subsequent_value
-
-    def extract_and_replace(self):
+        self.temp_name = temp_name
+        self.walrus_allowed = walrus_allowed
+        self.uses: int = 0
+        self._parent: Optional[AST] = None
+        self._first_use_parent: Optional[AST] = None
+        # how many levels of code that might not run straight away
+        # the visit is inside
+        self._deferred = 0
+        self._first_use_deferred = False
+
+    def inline(self) -> expr:
         """
         Return what the lambda does, but replaces
         references to the lambda arg with
         the passed in value
         """
-        self.visit(self._lambda.body)
-        return self._lambda.body
+        body = self.visit(self._lambda.body)
+        if self.uses == 0:
+            # this will throw an error at build time rather than runtime
+            # but shouldn't be a surprise to typecheckers
+            raise ValueError("This lambda has no arguments.")
+        if self._first_use_parent is None:
+            # the body is just the argument
+            return body
+        if self._first_use_deferred or (self.uses > 1 and not self.walrus_allowed):
+            # every reference is now the temporary variable,
+            # so that becomes the argument of the lambda
+            self._replace_first_use(
+                self._first_use_parent, Name(id=self.temp_name, ctx=_LOAD)
+            )
+            self._lambda.args.args[0].arg = self.temp_name
+            self._lambda.body = body
+            return Call(self._lambda, [self.value], [])
+        if self.uses > 1:
+            # NamedExpr is how := works behind the scenes.
+            walrus = NamedExpr(
+                target=Name(id=self.temp_name, ctx=_STORE), value=self.value
+            )
+            self._replace_first_use(self._first_use_parent, walrus)
+        return body
+
+    def _replace_first_use(self, parent: AST, replacement: expr):
+        """
+        Swap the value substituted for the first reference
+        with the replacement
+        """
+        for field, old_value in iter_fields(parent):
+            if old_value is self.value:
+                setattr(parent, field, replacement)
+                return
+            if isinstance(old_value, list):
+                for index, item in enumerate(old_value):  # type: ignore
+                    if item is self.value:
+                        old_value[index] = replacement
+                        return
+
+    def generic_visit(self, node: AST) -> AST:
+        """
+        Keep track of the parent node, so the first reference
+        can be found again
+        """
+        parent, self._parent = self._parent, node
+        node = super().generic_visit(node)
+        self._parent = parent
+        return node
+
+    def _visit_child(self, parent: AST, child: expr, deferred: bool = False) -> Any:
+        """
+        Visit a child of the node, noting if it might be evaluated
+        later than the nodes before it, or not at all
+        """
+        saved_parent, self._parent = self._parent, parent
+        self._deferred += deferred
+        child = self.visit(child)
+        self._deferred -= deferred
+        self._parent = saved_parent
+        return child
 
     def visit_Name(self, node: Name):
         """
-        Replace the internal lambda arg reference with the given value
-        If a subsequent value given, replace all values after the first with that
-        This allows assigning using a walrus in the first value, and then
-        using that value without recalculation in the second.
+        Replace the internal lambda arg reference with the given value,
+        and any after the first with the temporary variable
         """
         if node.id == self.arg_name:
-            if self.visit_count == 0:
-                self.visit_count += 1
+            self.uses += 1
+            if self.uses == 1:
+                self._first_use_parent = self._parent
+                self._first_use_deferred = self._deferred > 0
                 return self.value
-            if self.subsequent_value:
-                return self.subsequent_value
-            else:
-                raise ValueError("This lambda contains multiple references to the arg")
+            return Name(id=self.temp_name, ctx=_LOAD)
         return node
 
+    def visit_IfExp(self, node: IfExp) -> IfExp:
+        """
+        Only one branch of a conditional is evaluated
+        """
+        node.test = self._visit_child(node, node.test)
+        node.body = self._visit_child(node, node.body, True)
+        node.orelse = self._visit_child(node, node.orelse, True)
+        return node
 
-def copy_position(source: expr, destination: expr):
-    """
-    Copy the position information from one AST node to another
-    """
-    destination.lineno = source.lineno
-    destination.end_lineno = source.end_lineno
-    destination.col_offset = source.col_offset
-    destination.end_col_offset = source.end_col_offset
-
+    def visit_BoolOp(self, node: BoolOp) -> BoolOp:
+        """
+        and/or only evaluate their first value for certain
+        """
+        node.values = [
+            self._visit_child(node, value, index > 0)
+            for index, value in enumerate(node.values)
+        ]
+        return node
 
-class _CountLambdaArgUses(NodeVisitor):
-    """
-    Count the number of uses of the first argument in the lambda
-    in the lambda definition
-    """
+    def visit_Compare(self, node: Compare) -> Compare:
+        """
+        Chained comparisons stop at the first that is false
+        """
+        node.left = self._visit_child(node, node.left)
+        node.comparators = [
+            self._visit_child(node, comparator, index > 0)
+            for index, comparator in enumerate(node.comparators)
+        ]
+        return node
 
-    def __init__(self, _lambda: Lambda):
-        self._lambda = _lambda
-        self.arg_name = self._lambda.args.args[0].arg  # type: ignore
-        self.uses: int = 0
+    def visit_Dict(self, node: AstDict) -> AstDict:
+        """
+        Visit the keys and values in the order they're evaluated,
+        rather than all the keys first
+        """
+        for index, (key, value) in enumerate(zip(node.keys, node.values)):
+            if key is not None:
+                node.keys[index] = self._visit_child(node, key)
+            node.values[index] = self._visit_child(node, value)
+        return node
 
-    def check(self) -> int:
+    def visit_ListComp(
+        self, node: Union[ListComp, SetComp, DictComp, GeneratorExp]
+    ) -> AST:
         """
-        Get the number of times the arugment is referenced
+        Comprehensions are their own scope, and their
+        parts may not be evaluated at all
         """
-        self.visit(self._lambda.body)  # type: ignore
-        return self.uses
+        self._deferred += 1
+        node = self.generic_visit(node)  # type: ignore
+        self._deferred -= 1
+        return node
 
-    def visit_Name(self, node: Name):
+    visit_SetComp = visit_DictComp = visit_GeneratorExp = visit_ListComp  # type: ignore
+
+    def visit_Lambda(self, node: Lambda) -> Lambda:
         """
-        Increment the uses count if the name is the given arg
+        The body of a nested lambda is its own scope,
+        and is only evaluated when it is called.
+        If the nested lambda has a parameter of the same name, it
+        hides the argument, so there is nothing to replace in its body.
+        Only its defaults are evaluated outside of it.
         """
-        if node.id == self.arg_name:
-            self.uses += 1
-        self.generic_visit(node)
+        params = node.args
+        names = [
+            arg.arg for arg in params.posonlyargs + params.args + params.kwonlyargs
+        ]
+        if params.vararg:
+            names.append(params.vararg.arg)
+        if params.kwarg:
+            names.append(params.kwarg.arg)
+        params.defaults = [
+            self._visit_child(params, default) for default in params.defaults
+        ]
+        params.kw_defaults = [
+            default if default is None else self._visit_child(params, default)
+            for default in params.kw_defaults
+        ]
+        if self.arg_name not in names:
+            node.body = self._visit_child(node, node.body, True)
+        return node
+
+
+def _is_pipe_bridge(func: expr) -> bool:
+    """
+    Check if a function in a pipe is a direct use of pipe_bridge
+    that can be expanded in place
+    """
+    return (
+        isinstance(func, Call)
+        and isinstance(func.func, Name)
+        and func.func.id == "pipe_bridge"
+        and len(func.args) == 1
+        and not isinstance(func.args[0], Starred)
+        and not func.keywords
+    )
+
+
+def _inline_or_call(
+    func: expr, value: expr, temp_names: Iterator[str], walrus_allowed: bool = True
+) -> expr:
+    """
+    Get the expression for passing the value into
+    a single function in a pipe.
+    Lambdas and bridges are expanded, anything else is called.
+    Bridges need a walrus, so are called as normal
+    where a walrus is not allowed.
+    Each walrus takes a new name from temp_names, so that nested
+    pipes can't overwrite a variable that is still to be read.
+    """
+    if isinstance(func, Lambda):
+        # the lambda's body needs to be unpacked
+        return _LambdaInliner(func, value, next(temp_names), walrus_allowed).inline()
+    if walrus_allowed and _is_pipe_bridge(func):
+        # call the bridged function on the value
+        # but pass on the value itself
+        # e.g. a = pipe(5, pipe_bridge(print), str)
+        # becomes a = str((var := 5, print(var))[0])
+        temp_name = next(temp_names)
+        bridged = AstTuple(
+            elts=[
+                NamedExpr(
+                    target=Name(id=temp_name, ctx=_STORE),
+                    value=value,
+                ),
+                Call(
+                    func.args[0],  # type: ignore
+                    [Name(id=temp_name, ctx=_LOAD)],
+                    [],
+                ),
+            ],
+            ctx=_LOAD,
+        )
+        return Subscript(value=bridged, slice=Index(value=Constant(0)), ctx=_LOAD)
+    # if just a function, we're just building a nesting call chain
+    return Call(func, [value], [])
+
+
+def _rewrite_pipe_call(
+    node: Call, temp_names: Iterator[str], walrus_allowed: bool = True
+) -> expr:
+    """
+    Turn a call to pipe into nested calls of its functions.
+    """
+    value = node.args[0]
+    for func in node.args[1:]:
+        value = _inline_or_call(func, value, temp_names, walrus_allowed)
+    # the new expression takes the place of the pipe call.
+    # Nodes created inside it are given positions
+    # once the whole tree has been transformed.
+    return copy_location(value, node)
 
 
 class _PipeTransformer(NodeTransformer):
@@ -145,64 +436,238 @@ class _PipeTransformer(NodeTransformer):
 
     a = (var := c(b(a))) + var + 1
 
+    pipe_bridge is expanded in the same way, so the bridged function
+    is called directly.
+
+    a = pipe(a,b,pipe_bridge(c),d)
+
+    becomes:
+
+    a = d((var := b(a), c(var))[0])
+
+    A walrus can't be used in a comprehension's iterable,
+    or anywhere in a comprehension in a class body,
+    so bridges there are left as a call.
+
+    As the tree is parsed from dedented source, every node
+    is also moved by the given line and column offsets on the way
+    through, so that debuggers still point at the original file.
+
     """
 
+    def __init__(self, line_offset: int = 0, source_indent: int = 0):
+        self.line_offset = line_offset
+        self.source_indent = source_indent
+        self._walrus_allowed = True
+        self._in_class_body = False
+        # every walrus in the function gets its own variable
+        self._temp_names = map("_pipe_temp_var{}".format, count())
+
+    def _shift(self, node: AST):
+        """
+        Move the node by the line and column offsets
+        """
+        node.lineno += self.line_offset  # type: ignore
+        node.end_lineno += self.line_offset  # type: ignore
+        node.col_offset += self.source_indent  # type: ignore
+        node.end_col_offset += self.source_indent  # type: ignore
+
+    def generic_visit(self, node: AST) -> AST:
+        """
+        Shift the position of the node before visiting its children
+        """
+        if hasattr(node, "col_offset"):
+            self._shift(node)
+        return super().generic_visit(node)
+
+    def visit_Name(self, node: Name) -> Name:
+        """
+        Names are the most common node, and have nothing
+        below them to transform, so only need shifting
+        """
+        self._shift(node)
+        return node
+
     def visit_Call(self, node: Call) -> Any:
         """
         Replace all references to the pipe function with nested function calls.
         """
-        if node.func.id == "pipe":  # type: ignore
-            value = node.args[0]
-            funcs = node.args[1:]
-
-            # unpack the functions into nested calls
-            # unless the function is a lambda
-            # in which case, the lambda's body
-            # needs to be unpacked
-            for func in funcs:
-                if isinstance(func, Lambda):
-                    arg_usage = _CountLambdaArgUses(func).check()
-                    if arg_usage == 0:
-                        # this will throw an error at build time rather than runtime
-                        # but shouldn't be a surprise to typecheckers
-                        raise ValueError("This lambda has no arguments.")
-                    elif arg_usage == 1:
-                        # if the lambda only uses the argument once
-                        # can just substitute the arg in the lambda
-                        # with the value in the loop
-                        # e.g. a = pipe(5, lambda x: x + 1)
-                        # becomes a = 5 + 1
-                        value = _LambdaExtractor(func, value).extract_and_replace()
-                    elif arg_usage > 1:
-                        # if the lambda uses the argument more than once
-                        # have to assign the value to a variable first
-                        # (using a walrus)
-                        # and then use the variable in the lambda in subsequent calls.
-                        # e.g. a = pipe(5, lambda x: x + x + 1)
-                        # becomes a = (var := 5) + var + 1
-                        # NamedExpr is how := works behind the scenes.
-                        walrus = NamedExpr(
-                            target=Name(id="_pipe_temp_var", ctx=Store()), value=value
-                        )
-                        walrus.lineno = func.lineno
-                        copy_position(func, walrus)
-                        temp_var = Name(id="_pipe_temp_var", ctx=Load())
-                        copy_position(func, temp_var)
-                        value = _LambdaExtractor(
-                            func, walrus, temp_var
-                        ).extract_and_replace()
-                else:
-                    # if just a function, we're just building a nesting call chain
-                    value = Call(func, [value], [])
-                copy_position(func, value)
-            return value  # type: ignore
+        # calls to methods or other expressions have no id
+        if isinstance(node.func, Name) and node.func.id == "pipe":
+            # position and transform the arguments first
+            # so they are ready to be moved into the nested calls.
+            # Lambdas are visited as part of the surrounding scope,
+            # as the body is moved there when inlined.
+            self._shift(node)
+            node.func = self.visit(node.func)
+            node.args = [  # type: ignore
+                self.generic_visit(arg) if isinstance(arg, Lambda) else self.visit(arg)
+                for arg in node.args
+            ]
+            node.keywords = [self.visit(keyword) for keyword in node.keywords]
+            return _rewrite_pipe_call(node, self._temp_names, self._walrus_allowed)
         return self.generic_visit(node)
 
+    def _visit_scope(self, node: AST, walrus_allowed: bool, in_class_body: bool) -> AST:
+        """
+        Visit the node's children with the given restrictions on walruses
+        """
+        saved = self._walrus_allowed, self._in_class_body
+        self._walrus_allowed, self._in_class_body = walrus_allowed, in_class_body
+        node = self.generic_visit(node)
+        self._walrus_allowed, self._in_class_body = saved
+        return node
 
-def fast_pipes(func: Callable[..., T]) -> Callable[..., T]:
+    def visit_ClassDef(self, node: ClassDef) -> AST:
+        """
+        Comprehensions in a class body can't contain a walrus
+        """
+        return self._visit_scope(node, True, True)
+
+    def visit_FunctionDef(self, node: FunctionDef) -> AST:
+        """
+        A function body is a new scope, so walruses can be used again
+        """
+        return self._visit_scope(node, True, False)
+
+    visit_AsyncFunctionDef = visit_FunctionDef  # type: ignore
+
+    def visit_Lambda(self, node: Lambda) -> AST:
+        """
+        A lambda in a class body is a new scope,
+        but can still be part of a comprehension's iterable
+        """
+        return self._visit_scope(node, self._walrus_allowed, False)
+
+    def visit_ListComp(
+        self, node: Union[ListComp, SetComp, DictComp, GeneratorExp]
+    ) -> AST:
+        """
+        Comprehensions in a class body can't contain a walrus
+        """
+        return self._visit_scope(
+            node, self._walrus_allowed and not self._in_class_body, self._in_class_body
+        )
+
+    visit_SetComp = visit_DictComp = visit_GeneratorExp = visit_ListComp  # type: ignore
+
+    def visit_comprehension(self, node: comprehension) -> AST:
+        """
+        The iterable of a comprehension can't contain a walrus
+        """
+        node.target = self.visit(node.target)
+        walrus_allowed, self._walrus_allowed = self._walrus_allowed, False
+        node.iter = self.visit(node.iter)
+        self._walrus_allowed = walrus_allowed
+        node.ifs = [self.visit(condition) for condition in node.ifs]
+        return node
+
+
+def _decorator_name(decorator: expr) -> Optional[str]:
     """
-    Decorator function that replaces references to pipe with
-    the direct equivalent of the pipe function.
+    Get the name of the function used as a decorator.
+    The AST node for the decorator will be a Call if it had braces,
+    a Name if it was used directly, and an Attribute
+    if it was accessed through a module.
+    """
+    if isinstance(decorator, Call):
+        return _decorator_name(decorator.func)
+    if isinstance(decorator, Name):
+        return decorator.id
+    if isinstance(decorator, Attribute):
+        return decorator.attr
+    return None
+
+
+# Compiled fast_pipes definitions, keyed by the original code object
+# and the globals it was defined in.
+# Stores the source of the definition, and the code that redefines
+# the function and the name it defines, or None if the function
+# doesn't use pipe and is left as it is.
+# Code objects compare by value, so an unchanged function in a reloaded
+# module finds its earlier entry, while an edited one does not.
+# The code object doesn't include default values, annotations or
+# decorators, which the redefinition also runs, so the source is
+# checked before an entry is reused.
+_FAST_PIPE_CACHE: Dict[
+    Tuple[CodeType, int], Tuple[str, Optional[Tuple[CodeType, str]]]
+] = {}
+
+
+# fast_pipes definitions written ahead of time by function_pipes.precompile,
+# loaded once per source file.
+# For each source file, maps the first line of each function to its
+# original code object, the number of lines and hash of its source,
+# and its compiled fast_pipes definition.
+_PRECOMPILED: Dict[
+    str, Dict[int, Tuple[CodeType, int, bytes, Optional[Tuple[CodeType, str]]]]
+] = {}
+
+
+def _precompiled_path(filename: str) -> str:
+    """
+    Get the path of the precompiled definitions for a source file
+    """
+    return splitext(filename)[0] + ".fastpipes"
+
+
+def _load_precompiled(
+    filename: str,
+) -> Dict[int, Tuple[CodeType, int, bytes, Optional[Tuple[CodeType, str]]]]:
+    """
+    Load the precompiled definitions for a source file.
+    Files that are missing, unreadable or written by a different
+    version of Python or function_pipes are treated as having
+    no definitions.
+    """
+    if filename not in _PRECOMPILED:
+        try:
+            with open(_precompiled_path(filename), "rb") as f:
+                magic, version, definitions = marshal.load(f)
+        except (OSError, EOFError, ValueError, TypeError):
+            magic, version, definitions = None, None, {}
+        current = magic == MAGIC_NUMBER and version == __version__
+        _PRECOMPILED[filename] = definitions if current else {}
+    return _PRECOMPILED[filename]
+
+
+def _current_source(func: Callable[..., Any], line_count: int) -> str:
+    """
+    Get the lines of the file the function's definition started on,
+    as they are now.
+    This is only a check of the cached lines, so is much cheaper
+    than finding the definition again with getsource.
+    """
+    filename = func.__code__.co_filename
+    checkcache(filename)
+    start = func.__code__.co_firstlineno - 1
+    return "".join(getlines(filename, func.__globals__)[start : start + line_count])
+
+
+def _source_hash(source: str) -> bytes:
+    """
+    Hash of a definition's source, to check precompiled
+    definitions against
+    """
+    return sha256(source.encode()).digest()
+
+
+def _is_current(func: Callable[..., Any], source: str) -> bool:
+    """
+    Check if the source a definition was compiled from
+    is still the source of the function
+    """
+    return bool(source) and _current_source(func, source.count("\n")) == source
+
+
+def _compile_fast_pipes(
+    func: Callable[..., Any], source: str
+) -> Optional[Tuple[CodeType, str]]:
+    """
+    Compile a definition of the function from its source,
+    with pipes replaced by nested calls.
+    Returns the code and the name it defines, or None
+    if there are no pipes to replace.
     """
 
     # This approach adapted from
@@ -210,38 +675,33 @@ def fast_pipes(func: Callable[..., T]) -> Callable[..., T]:
     ctx = func.__globals__
     first_line_number = func.__code__.co_firstlineno
 
-    source = getsource(func)
+    # nothing to rewrite, so don't pay for parsing and compiling
+    if "pipe(" not in source:
+        return None
 
     # AST data structure representing parsed function code
     tree = parse(dedent(source))
 
-    # Fix line and column numbers so that debuggers still work
-    increment_lineno(tree, first_line_number - 1)
-    source_indent = sum([1 for _ in takewhile(str.isspace, source)]) + 1
-
-    for node in walk(tree):
-        if hasattr(node, "col_offset"):
-            node.col_offset += source_indent
+    # Line and column numbers are fixed while transforming
+    # so that debuggers still work
+    source_indent = len(source) - len(source.lstrip())
 
     # Update name of function or class to compile
     tree.body[0].name += "_fast_pipe"  # type: ignore
 
-    # remove the pipe decorator so that we don't recursively
-    # call it again. The AST node for the decorator will be a
-    # Call if it had braces, and a Name if it had no braces.
-    # The location of the decorator function name in these
-    # nodes is slightly different.
-    tree.body[0].decorator_list = [  # type: ignore
-        d
-        for d in tree.body[0].decorator_list  # type: ignore
-        if isinstance(d, Call)
-        and d.func.id != "fast_pipes"  # type: ignore
-        or isinstance(d, Name)
-        and d.id != "fast_pipes"
-    ]
+    # Only keep the decorators below fast_pipes, as they were applied
+    # before it. Removing fast_pipes itself stops it being called
+    # recursively, and the decorators above it are applied by python
+    # to the function it returns.
+    decorators = tree.body[0].decorator_list  # type: ignore
+    names = [_decorator_name(d) for d in decorators]
+    if "fast_pipes" in names:
+        last_fast_pipes = len(names) - 1 - names[::-1].index("fast_pipes")
+        tree.body[0].decorator_list = decorators[last_fast_pipes + 1 :]  # type: ignore
 
     # Apply the visit_Call transformation
-    tree = _PipeTransformer().visit(tree)
+    tree = _PipeTransformer(first_line_number - 1, source_indent).visit(tree)
+    fix_missing_locations(tree)
 
     # now compile the AST into an altered function or class definition
     try:
@@ -249,6 +709,8 @@ def fast_pipes(func: Callable[..., T]) -> Callable[..., T]:
             tree,
             filename=(ctx["__file__"] if "__file__" in ctx else "repl"),
             mode="exec",
+            flags=func.__code__.co_flags & _FUTURE_FLAGS,
+            dont_inherit=True,
         )
     except SyntaxError as e:
         # The syntax is rearranged in a way that triggers a starred error correctly
@@ -261,12 +723,43 @@ def fast_pipes(func: Callable[..., T]) -> Callable[..., T]:
             e.msg = "pipe can't take a starred expression as an argument when fast_pipes is used."
         raise e
 
+    return code, tree.body[0].name  # type: ignore
+
+
+def fast_pipes(func: Callable[..., T]) -> Callable[..., T]:
+    """
+    Decorator function that replaces references to pipe with
+    the direct equivalent of the pipe function.
+    """
+    ctx = func.__globals__
+
+    # If this function has been rewritten before (e.g. a factory applying
+    # the decorator repeatedly, or a reloaded module), reuse the compiled
+    # definition rather than reading and transforming the source again.
+    cache_key = (func.__code__, id(ctx))
+    cached = _FAST_PIPE_CACHE.get(cache_key)
+    if cached is None or not _is_current(func, cached[0]):
+        # precompiled definitions are only used if the function
+        # is still the same as when they were written
+        original, line_count, source_hash, compiled = _load_precompiled(
+            func.__code__.co_filename
+        ).get(func.__code__.co_firstlineno, (None, 0, b"", None))
+        source = _current_source(func, line_count)
+        if original != func.__code__ or _source_hash(source) != source_hash:
+            source = getsource(func)
+            compiled = _compile_fast_pipes(func, source)
+        cached = _FAST_PIPE_CACHE[cache_key] = (source, compiled)
+    compiled = cached[1]
+    if compiled is None:
+        return func
+    code, name = compiled
+
     # and execute the definition in the original context so that the
     # decorated function can access the same scopes as the original
     exec(code, ctx)
 
     # return the modified function or class - original is nevers called
-    return ctx[tree.body[0].name]
+    return ctx[name]
 
 
 BridgeType = TypeVar("BridgeType")
@@ -276,7 +769,6 @@ InputVal = TypeVar("InputVal")
 # self consistent in the declared function
 stand_in_callable = Union[Callable[..., Any], None]
 
-
 Out0 = TypeVar("Out0")
 Out1 = TypeVar("Out1")
 Out2 = TypeVar("Out2")
@@ -324,878 +816,813 @@ def pipe_bridge(
     return _inner
 
 
-@overload
-def pipe(value: InputVal, op0: Callable[[InputVal], Out0], /) -> Out0:
-    ...
-
-
-@overload
-def pipe(
-    value: InputVal, op0: Callable[[InputVal], Out0], op1: Callable[[Out0], Out1], /
-) -> Out1:
-    ...
-
-
-@overload
-def pipe(
-    value: InputVal,
-    op0: Callable[[InputVal], Out0],
-    op1: Callable[[Out0], Out1],
-    op2: Callable[[Out1], Out2],
-    /,
-) -> Out2:
-    ...
-
-
-@overload
-def pipe(
-    value: InputVal,
-    op0: Callable[[InputVal], Out0],
-    op1: Callable[[Out0], Out1],
-    op2: Callable[[Out1], Out2],
-    op3: Callable[[Out2], Out3],
-    /,
-) -> Out3:
-    ...
-
-
-@overload
-def pipe(
-    value: InputVal,
-    op0: Callable[[InputVal], Out0],
-    op1: Callable[[Out0], Out1],
-    op2: Callable[[Out1], Out2],
-    op3: Callable[[Out2], Out3],
-    op4: Callable[[Out3], Out4],
-    /,
-) -> Out4:
-    ...
-
-
-@overload
-def pipe(
-    value: InputVal,
-    op0: Callable[[InputVal], Out0],
-    op1: Callable[[Out0], Out1],
-    op2: Callable[[Out1], Out2],
-    op3: Callable[[Out2], Out3],
-    op4: Callable[[Out3], Out4],
-    op5: Callable[[Out4], Out5],
-    /,
-) -> Out5:
-    ...
-
-
-@overload
-def pipe(
-    value: InputVal,
-    op0: Callable[[InputVal], Out0],
-    op1: Callable[[Out0], Out1],
-    op2: Callable[[Out1], Out2],
-    op3: Callable[[Out2], Out3],
-    op4: Callable[[Out3], Out4],
-    op5: Callable[[Out4], Out5],
-    op6: Callable[[Out5], Out6],
-    /,
-) -> Out6:
-    ...
-
-
-@overload
-def pipe(
-    value: InputVal,
-    op0: Callable[[InputVal], Out0],
-    op1: Callable[[Out0], Out1],
-    op2: Callable[[Out1], Out2],
-    op3: Callable[[Out2], Out3],
-    op4: Callable[[Out3], Out4],
-    op5: Callable[[Out4], Out5],
-    op6: Callable[[Out5], Out6],
-    op7: Callable[[Out6], Out7],
-    /,
-) -> Out7:
-    ...
-
-
-@overload
-def pipe(
-    value: InputVal,
-    op0: Callable[[InputVal], Out0],
-    op1: Callable[[Out0], Out1],
-    op2: Callable[[Out1], Out2],
-    op3: Callable[[Out2], Out3],
-    op4: Callable[[Out3], Out4],
-    op5: Callable[[Out4], Out5],
-    op6: Callable[[Out5], Out6],
-    op7: Callable[[Out6], Out7],
-    op8: Callable[[Out7], Out8],
-    /,
-) -> Out8:
-    ...
-
-
-@overload
-def pipe(
-    value: InputVal,
-    op0: Callable[[InputVal], Out0],
-    op1: Callable[[Out0], Out1],
-    op2: Callable[[Out1], Out2],
-    op3: Callable[[Out2], Out3],
-    op4: Callable[[Out3], Out4],
-    op5: Callable[[Out4], Out5],
-    op6: Callable[[Out5], Out6],
-    op7: Callable[[Out6], Out7],
-    op8: Callable[[Out7], Out8],
-    op9: Callable[[Out8], Out9],
-    /,
-) -> Out9:
-    ...
-
-
-@overload
-def pipe(
-    value: InputVal,
-    op0: Callable[[InputVal], Out0],
-    op1: Callable[[Out0], Out1],
-    op2: Callable[[Out1], Out2],
-    op3: Callable[[Out2], Out3],
-    op4: Callable[[Out3], Out4],
-    op5: Callable[[Out4], Out5],
-    op6: Callable[[Out5], Out6],
-    op7: Callable[[Out6], Out7],
-    op8: Callable[[Out7], Out8],
-    op9: Callable[[Out8], Out9],
-    op10: Callable[[Out9], Out10],
-    /,
-) -> Out10:
-    ...
-
-
-@overload
-def pipe(
-    value: InputVal,
-    op0: Callable[[InputVal], Out0],
-    op1: Callable[[Out0], Out1],
-    op2: Callable[[Out1], Out2],
-    op3: Callable[[Out2], Out3],
-    op4: Callable[[Out3], Out4],
-    op5: Callable[[Out4], Out5],
-    op6: Callable[[Out5], Out6],
-    op7: Callable[[Out6], Out7],
-    op8: Callable[[Out7], Out8],
-    op9: Callable[[Out8], Out9],
-    op10: Callable[[Out9], Out10],
-    op11: Callable[[Out10], Out11],
-    /,
-) -> Out11:
-    ...
-
-
-@overload
-def pipe(
-    value: InputVal,
-    op0: Callable[[InputVal], Out0],
-    op1: Callable[[Out0], Out1],
-    op2: Callable[[Out1], Out2],
-    op3: Callable[[Out2], Out3],
-    op4: Callable[[Out3], Out4],
-    op5: Callable[[Out4], Out5],
-    op6: Callable[[Out5], Out6],
-    op7: Callable[[Out6], Out7],
-    op8: Callable[[Out7], Out8],
-    op9: Callable[[Out8], Out9],
-    op10: Callable[[Out9], Out10],
-    op11: Callable[[Out10], Out11],
-    op12: Callable[[Out11], Out12],
-    /,
-) -> Out12:
-    ...
-
-
-@overload
-def pipe(
-    value: InputVal,
-    op0: Callable[[InputVal], Out0],
-    op1: Callable[[Out0], Out1],
-    op2: Callable[[Out1], Out2],
-    op3: Callable[[Out2], Out3],
-    op4: Callable[[Out3], Out4],
-    op5: Callable[[Out4], Out5],
-    op6: Callable[[Out5], Out6],
-    op7: Callable[[Out6], Out7],
-    op8: Callable[[Out7], Out8],
-    op9: Callable[[Out8], Out9],
-    op10: Callable[[Out9], Out10],
-    op11: Callable[[Out10], Out11],
-    op12: Callable[[Out11], Out12],
-    op13: Callable[[Out12], Out13],
-    /,
-) -> Out13:
-    ...
-
-
-@overload
-def pipe(
-    value: InputVal,
-    op0: Callable[[InputVal], Out0],
-    op1: Callable[[Out0], Out1],
-    op2: Callable[[Out1], Out2],
-    op3: Callable[[Out2], Out3],
-    op4: Callable[[Out3], Out4],
-    op5: Callable[[Out4], Out5],
-    op6: Callable[[Out5], Out6],
-    op7: Callable[[Out6], Out7],
-    op8: Callable[[Out7], Out8],
-    op9: Callable[[Out8], Out9],
-    op10: Callable[[Out9], Out10],
-    op11: Callable[[Out10], Out11],
-    op12: Callable[[Out11], Out12],
-    op13: Callable[[Out12], Out13],
-    op14: Callable[[Out13], Out14],
-    /,
-) -> Out14:
-    ...
-
-
-@overload
-def pipe(
-    value: InputVal,
-    op0: Callable[[InputVal], Out0],
-    op1: Callable[[Out0], Out1],
-    op2: Callable[[Out1], Out2],
-    op3: Callable[[Out2], Out3],
-    op4: Callable[[Out3], Out4],
-    op5: Callable[[Out4], Out5],
-    op6: Callable[[Out5], Out6],
-    op7: Callable[[Out6], Out7],
-    op8: Callable[[Out7], Out8],
-    op9: Callable[[Out8], Out9],
-    op10: Callable[[Out9], Out10],
-    op11: Callable[[Out10], Out11],
-    op12: Callable[[Out11], Out12],
-    op13: Callable[[Out12], Out13],
-    op14: Callable[[Out13], Out14],
-    op15: Callable[[Out14], Out15],
-    /,
-) -> Out15:
-    ...
-
-
-@overload
-def pipe(
-    value: InputVal,
-    op0: Callable[[InputVal], Out0],
-    op1: Callable[[Out0], Out1],
-    op2: Callable[[Out1], Out2],
-    op3: Callable[[Out2], Out3],
-    op4: Callable[[Out3], Out4],
-    op5: Callable[[Out4], Out5],
-    op6: Callable[[Out5], Out6],
-    op7: Callable[[Out6], Out7],
-    op8: Callable[[Out7], Out8],
-    op9: Callable[[Out8], Out9],
-    op10: Callable[[Out9], Out10],
-    op11: Callable[[Out10], Out11],
-    op12: Callable[[Out11], Out12],
-    op13: Callable[[Out12], Out13],
-    op14: Callable[[Out13], Out14],
-    op15: Callable[[Out14], Out15],
-    op16: Callable[[Out15], Out16],
-    /,
-) -> Out16:
-    ...
-
-
-@overload
-def pipe(
-    value: InputVal,
-    op0: Callable[[InputVal], Out0],
-    op1: Callable[[Out0], Out1],
-    op2: Callable[[Out1], Out2],
-    op3: Callable[[Out2], Out3],
-    op4: Callable[[Out3], Out4],
-    op5: Callable[[Out4], Out5],
-    op6: Callable[[Out5], Out6],
-    op7: Callable[[Out6], Out7],
-    op8: Callable[[Out7], Out8],
-    op9: Callable[[Out8], Out9],
-    op10: Callable[[Out9], Out10],
-    op11: Callable[[Out10], Out11],
-    op12: Callable[[Out11], Out12],
-    op13: Callable[[Out12], Out13],
-    op14: Callable[[Out13], Out14],
-    op15: Callable[[Out14], Out15],
-    op16: Callable[[Out15], Out16],
-    op17: Callable[[Out16], Out17],
-    /,
-) -> Out17:
-    ...
-
-
-@overload
-def pipe(
-    value: InputVal,
-    op0: Callable[[InputVal], Out0],
-    op1: Callable[[Out0], Out1],
-    op2: Callable[[Out1], Out2],
-    op3: Callable[[Out2], Out3],
-    op4: Callable[[Out3], Out4],
-    op5: Callable[[Out4], Out5],
-    op6: Callable[[Out5], Out6],
-    op7: Callable[[Out6], Out7],
-    op8: Callable[[Out7], Out8],
-    op9: Callable[[Out8], Out9],
-    op10: Callable[[Out9], Out10],
-    op11: Callable[[Out10], Out11],
-    op12: Callable[[Out11], Out12],
-    op13: Callable[[Out12], Out13],
-    op14: Callable[[Out13], Out14],
-    op15: Callable[[Out14], Out15],
-    op16: Callable[[Out15], Out16],
-    op17: Callable[[Out16], Out17],
-    op18: Callable[[Out17], Out18],
-    /,
-) -> Out18:
-    ...
+# The overloads only exist for type checkers,
+# so aren't defined at runtime.
+if TYPE_CHECKING:
+
+    @overload
+    def pipe(value: InputVal, op0: Callable[[InputVal], Out0], /) -> Out0:
+        ...
+
+    @overload
+    def pipe(
+        value: InputVal, op0: Callable[[InputVal], Out0], op1: Callable[[Out0], Out1], /
+    ) -> Out1:
+        ...
+
+    @overload
+    def pipe(
+        value: InputVal,
+        op0: Callable[[InputVal], Out0],
+        op1: Callable[[Out0], Out1],
+        op2: Callable[[Out1], Out2],
+        /,
+    ) -> Out2:
+        ...
+
+    @overload
+    def pipe(
+        value: InputVal,
+        op0: Callable[[InputVal], Out0],
+        op1: Callable[[Out0], Out1],
+        op2: Callable[[Out1], Out2],
+        op3: Callable[[Out2], Out3],
+        /,
+    ) -> Out3:
+        ...
+
+    @overload
+    def pipe(
+        value: InputVal,
+        op0: Callable[[InputVal], Out0],
+        op1: Callable[[Out0], Out1],
+        op2: Callable[[Out1], Out2],
+        op3: Callable[[Out2], Out3],
+        op4: Callable[[Out3], Out4],
+        /,
+    ) -> Out4:
+        ...
+
+    @overload
+    def pipe(
+        value: InputVal,
+        op0: Callable[[InputVal], Out0],
+        op1: Callable[[Out0], Out1],
+        op2: Callable[[Out1], Out2],
+        op3: Callable[[Out2], Out3],
+        op4: Callable[[Out3], Out4],
+        op5: Callable[[Out4], Out5],
+        /,
+    ) -> Out5:
+        ...
+
+    @overload
+    def pipe(
+        value: InputVal,
+        op0: Callable[[InputVal], Out0],
+        op1: Callable[[Out0], Out1],
+        op2: Callable[[Out1], Out2],
+        op3: Callable[[Out2], Out3],
+        op4: Callable[[Out3], Out4],
+        op5: Callable[[Out4], Out5],
+        op6: Callable[[Out5], Out6],
+        /,
+    ) -> Out6:
+        ...
+
+    @overload
+    def pipe(
+        value: InputVal,
+        op0: Callable[[InputVal], Out0],
+        op1: Callable[[Out0], Out1],
+        op2: Callable[[Out1], Out2],
+        op3: Callable[[Out2], Out3],
+        op4: Callable[[Out3], Out4],
+        op5: Callable[[Out4], Out5],
+        op6: Callable[[Out5], Out6],
+        op7: Callable[[Out6], Out7],
+        /,
+    ) -> Out7:
+        ...
+
+    @overload
+    def pipe(
+        value: InputVal,
+        op0: Callable[[InputVal], Out0],
+        op1: Callable[[Out0], Out1],
+        op2: Callable[[Out1], Out2],
+        op3: Callable[[Out2], Out3],
+        op4: Callable[[Out3], Out4],
+        op5: Callable[[Out4], Out5],
+        op6: Callable[[Out5], Out6],
+        op7: Callable[[Out6], Out7],
+        op8: Callable[[Out7], Out8],
+        /,
+    ) -> Out8:
+        ...
+
+    @overload
+    def pipe(
+        value: InputVal,
+        op0: Callable[[InputVal], Out0],
+        op1: Callable[[Out0], Out1],
+        op2: Callable[[Out1], Out2],
+        op3: Callable[[Out2], Out3],
+        op4: Callable[[Out3], Out4],
+        op5: Callable[[Out4], Out5],
+        op6: Callable[[Out5], Out6],
+        op7: Callable[[Out6], Out7],
+        op8: Callable[[Out7], Out8],
+        op9: Callable[[Out8], Out9],
+        /,
+    ) -> Out9:
+        ...
+
+    @overload
+    def pipe(
+        value: InputVal,
+        op0: Callable[[InputVal], Out0],
+        op1: Callable[[Out0], Out1],
+        op2: Callable[[Out1], Out2],
+        op3: Callable[[Out2], Out3],
+        op4: Callable[[Out3], Out4],
+        op5: Callable[[Out4], Out5],
+        op6: Callable[[Out5], Out6],
+        op7: Callable[[Out6], Out7],
+        op8: Callable[[Out7], Out8],
+        op9: Callable[[Out8], Out9],
+        op10: Callable[[Out9], Out10],
+        /,
+    ) -> Out10:
+        ...
+
+    @overload
+    def pipe(
+        value: InputVal,
+        op0: Callable[[InputVal], Out0],
+        op1: Callable[[Out0], Out1],
+        op2: Callable[[Out1], Out2],
+        op3: Callable[[Out2], Out3],
+        op4: Callable[[Out3], Out4],
+        op5: Callable[[Out4], Out5],
+        op6: Callable[[Out5], Out6],
+        op7: Callable[[Out6], Out7],
+        op8: Callable[[Out7], Out8],
+        op9: Callable[[Out8], Out9],
+        op10: Callable[[Out9], Out10],
+        op11: Callable[[Out10], Out11],
+        /,
+    ) -> Out11:
+        ...
+
+    @overload
+    def pipe(
+        value: InputVal,
+        op0: Callable[[InputVal], Out0],
+        op1: Callable[[Out0], Out1],
+        op2: Callable[[Out1], Out2],
+        op3: Callable[[Out2], Out3],
+        op4: Callable[[Out3], Out4],
+        op5: Callable[[Out4], Out5],
+        op6: Callable[[Out5], Out6],
+        op7: Callable[[Out6], Out7],
+        op8: Callable[[Out7], Out8],
+        op9: Callable[[Out8], Out9],
+        op10: Callable[[Out9], Out10],
+        op11: Callable[[Out10], Out11],
+        op12: Callable[[Out11], Out12],
+        /,
+    ) -> Out12:
+        ...
+
+    @overload
+    def pipe(
+        value: InputVal,
+        op0: Callable[[InputVal], Out0],
+        op1: Callable[[Out0], Out1],
+        op2: Callable[[Out1], Out2],
+        op3: Callable[[Out2], Out3],
+        op4: Callable[[Out3], Out4],
+        op5: Callable[[Out4], Out5],
+        op6: Callable[[Out5], Out6],
+        op7: Callable[[Out6], Out7],
+        op8: Callable[[Out7], Out8],
+        op9: Callable[[Out8], Out9],
+        op10: Callable[[Out9], Out10],
+        op11: Callable[[Out10], Out11],
+        op12: Callable[[Out11], Out12],
+        op13: Callable[[Out12], Out13],
+        /,
+    ) -> Out13:
+        ...
+
+    @overload
+    def pipe(
+        value: InputVal,
+        op0: Callable[[InputVal], Out0],
+        op1: Callable[[Out0], Out1],
+        op2: Callable[[Out1], Out2],
+        op3: Callable[[Out2], Out3],
+        op4: Callable[[Out3], Out4],
+        op5: Callable[[Out4], Out5],
+        op6: Callable[[Out5], Out6],
+        op7: Callable[[Out6], Out7],
+        op8: Callable[[Out7], Out8],
+        op9: Callable[[Out8], Out9],
+        op10: Callable[[Out9], Out10],
+        op11: Callable[[Out10], Out11],
+        op12: Callable[[Out11], Out12],
+        op13: Callable[[Out12], Out13],
+        op14: Callable[[Out13], Out14],
+        /,
+    ) -> Out14:
+        ...
+
+    @overload
+    def pipe(
+        value: InputVal,
+        op0: Callable[[InputVal], Out0],
+        op1: Callable[[Out0], Out1],
+        op2: Callable[[Out1], Out2],
+        op3: Callable[[Out2], Out3],
+        op4: Callable[[Out3], Out4],
+        op5: Callable[[Out4], Out5],
+        op6: Callable[[Out5], Out6],
+        op7: Callable[[Out6], Out7],
+        op8: Callable[[Out7], Out8],
+        op9: Callable[[Out8], Out9],
+        op10: Callable[[Out9], Out10],
+        op11: Callable[[Out10], Out11],
+        op12: Callable[[Out11], Out12],
+        op13: Callable[[Out12], Out13],
+        op14: Callable[[Out13], Out14],
+        op15: Callable[[Out14], Out15],
+        /,
+    ) -> Out15:
+        ...
+
+    @overload
+    def pipe(
+        value: InputVal,
+        op0: Callable[[InputVal], Out0],
+        op1: Callable[[Out0], Out1],
+        op2: Callable[[Out1], Out2],
+        op3: Callable[[Out2], Out3],
+        op4: Callable[[Out3], Out4],
+        op5: Callable[[Out4], Out5],
+        op6: Callable[[Out5], Out6],
+        op7: Callable[[Out6], Out7],
+        op8: Callable[[Out7], Out8],
+        op9: Callable[[Out8], Out9],
+        op10: Callable[[Out9], Out10],
+        op11: Callable[[Out10], Out11],
+        op12: Callable[[Out11], Out12],
+        op13: Callable[[Out12], Out13],
+        op14: Callable[[Out13], Out14],
+        op15: Callable[[Out14], Out15],
+        op16: Callable[[Out15], Out16],
+        /,
+    ) -> Out16:
+        ...
+
+    @overload
+    def pipe(
+        value: InputVal,
+        op0: Callable[[InputVal], Out0],
+        op1: Callable[[Out0], Out1],
+        op2: Callable[[Out1], Out2],
+        op3: Callable[[Out2], Out3],
+        op4: Callable[[Out3], Out4],
+        op5: Callable[[Out4], Out5],
+        op6: Callable[[Out5], Out6],
+        op7: Callable[[Out6], Out7],
+        op8: Callable[[Out7], Out8],
+        op9: Callable[[Out8], Out9],
+        op10: Callable[[Out9], Out10],
+        op11: Callable[[Out10], Out11],
+        op12: Callable[[Out11], Out12],
+        op13: Callable[[Out12], Out13],
+        op14: Callable[[Out13], Out14],
+        op15: Callable[[Out14], Out15],
+        op16: Callable[[Out15], Out16],
+        op17: Callable[[Out16], Out17],
+        /,
+    ) -> Out17:
+        ...
+
+    @overload
+    def pipe(
+        value: InputVal,
+        op0: Callable[[InputVal], Out0],
+        op1: Callable[[Out0], Out1],
+        op2: Callable[[Out1], Out2],
+        op3: Callable[[Out2], Out3],
+        op4: Callable[[Out3], Out4],
+        op5: Callable[[Out4], Out5],
+        op6: Callable[[Out5], Out6],
+        op7: Callable[[Out6], Out7],
+        op8: Callable[[Out7], Out8],
+        op9: Callable[[Out8], Out9],
+        op10: Callable[[Out9], Out10],
+        op11: Callable[[Out10], Out11],
+        op12: Callable[[Out11], Out12],
+        op13: Callable[[Out12], Out13],
+        op14: Callable[[Out13], Out14],
+        op15: Callable[[Out14], Out15],
+        op16: Callable[[Out15], Out16],
+        op17: Callable[[Out16], Out17],
+        op18: Callable[[Out17], Out18],
+        /,
+    ) -> Out18:
+        ...
 
 
 def pipe(value: Any, op0: stand_in_callable = None, op1: stand_in_callable = None, op2: stand_in_callable = None, op3: stand_in_callable = None, op4: stand_in_callable = None, op5: stand_in_callable = None, op6: stand_in_callable = None, op7: stand_in_callable = None, op8: stand_in_callable = None, op9: stand_in_callable = None, op10: stand_in_callable = None, op11: stand_in_callable = None, op12: stand_in_callable = None, op13: stand_in_callable = None, op14: stand_in_callable = None, op15: stand_in_callable = None, op16: stand_in_callable = None, op17: stand_in_callable = None, op18: stand_in_callable = None, op19: stand_in_callable = None, /) -> Any:  # type: ignore
     """
     Pipe takes up to 20 functions and applies them to a value.
     """
+    # ops are filled from the left, so the first None marks the end
+    # and the checks can split the range in half each time.
+    # These are deliberately named parameters rather than *ops:
+    # filling unused defaults is cheaper than pulling each function
+    # back out of an args tuple, which measured 10-20% slower
+    # for four or more functions.
+    if op9 is None:
+        if op4 is None:
+            if op1 is None:
+                if op0 is None:
+                    return value  # fmt: skip
+                else:
+                    return op0(value)  # type: ignore  # fmt: skip
+            else:
+                if op2 is None:
+                    return op1(op0(value))  # type: ignore  # fmt: skip
+                else:
+                    if op3 is None:
+                        return op2(op1(op0(value)))  # type: ignore  # fmt: skip
+                    else:
+                        return op3(op2(op1(op0(value))))  # type: ignore  # fmt: skip
+        else:
+            if op6 is None:
+                if op5 is None:
+                    return op4(op3(op2(op1(op0(value)))))  # type: ignore  # fmt: skip
+                else:
+                    return op5(op4(op3(op2(op1(op0(value))))))  # type: ignore  # fmt: skip
+            else:
+                if op7 is None:
+                    return op6(op5(op4(op3(op2(op1(op0(value)))))))  # type: ignore  # fmt: skip
+                else:
+                    if op8 is None:
+                        return op7(op6(op5(op4(op3(op2(op1(op0(value))))))))  # type: ignore  # fmt: skip
+                    else:
+                        return op8(op7(op6(op5(op4(op3(op2(op1(op0(value)))))))))  # type: ignore  # fmt: skip
+    else:
+        if op14 is None:
+            if op11 is None:
+                if op10 is None:
+                    return op9(op8(op7(op6(op5(op4(op3(op2(op1(op0(value))))))))))  # type: ignore  # fmt: skip
+                else:
+                    return op10(op9(op8(op7(op6(op5(op4(op3(op2(op1(op0(value)))))))))))  # type: ignore  # fmt: skip
+            else:
+                if op12 is None:
+                    return op11(op10(op9(op8(op7(op6(op5(op4(op3(op2(op1(op0(value))))))))))))  # type: ignore  # fmt: skip
+                else:
+                    if op13 is None:
+                        return op12(op11(op10(op9(op8(op7(op6(op5(op4(op3(op2(op1(op0(value)))))))))))))  # type: ignore  # fmt: skip
+                    else:
+                        return op13(op12(op11(op10(op9(op8(op7(op6(op5(op4(op3(op2(op1(op0(value))))))))))))))  # type: ignore  # fmt: skip
+        else:
+            if op17 is None:
+                if op15 is None:
+                    return op14(op13(op12(op11(op10(op9(op8(op7(op6(op5(op4(op3(op2(op1(op0(value)))))))))))))))  # type: ignore  # fmt: skip
+                else:
+                    if op16 is None:
+                        return op15(op14(op13(op12(op11(op10(op9(op8(op7(op6(op5(op4(op3(op2(op1(op0(value))))))))))))))))  # type: ignore  # fmt: skip
+                    else:
+                        return op16(op15(op14(op13(op12(op11(op10(op9(op8(op7(op6(op5(op4(op3(op2(op1(op0(value)))))))))))))))))  # type: ignore  # fmt: skip
+            else:
+                if op18 is None:
+                    return op17(op16(op15(op14(op13(op12(op11(op10(op9(op8(op7(op6(op5(op4(op3(op2(op1(op0(value))))))))))))))))))  # type: ignore  # fmt: skip
+                else:
+                    if op19 is None:
+                        return op18(op17(op16(op15(op14(op13(op12(op11(op10(op9(op8(op7(op6(op5(op4(op3(op2(op1(op0(value)))))))))))))))))))  # type: ignore  # fmt: skip
+                    else:
+                        return op19(op18(op17(op16(op15(op14(op13(op12(op11(op10(op9(op8(op7(op6(op5(op4(op3(op2(op1(op0(value))))))))))))))))))))  # type: ignore  # fmt: skip
 
-    if not op0:
-        return value  # fmt: skip
-
-    elif not op1:
-        return op0(value)  # fmt: skip
-
-    elif not op2:
-        return op1(op0(value))  # fmt: skip
-
-    elif not op3:
-        return op2(op1(op0(value)))  # fmt: skip
-
-    elif not op4:
-        return op3(op2(op1(op0(value))))  # fmt: skip
-
-    elif not op5:
-        return op4(op3(op2(op1(op0(value)))))  # fmt: skip
-
-    elif not op6:
-        return op5(op4(op3(op2(op1(op0(value))))))  # fmt: skip
-
-    elif not op7:
-        return op6(op5(op4(op3(op2(op1(op0(value)))))))  # fmt: skip
-
-    elif not op8:
-        return op7(op6(op5(op4(op3(op2(op1(op0(value))))))))  # fmt: skip
-
-    elif not op9:
-        return op8(op7(op6(op5(op4(op3(op2(op1(op0(value)))))))))  # fmt: skip
-
-    elif not op10:
-        return op9(op8(op7(op6(op5(op4(op3(op2(op1(op0(value))))))))))  # fmt: skip
-
-    elif not op11:
-        return op10(op9(op8(op7(op6(op5(op4(op3(op2(op1(op0(value)))))))))))  # fmt: skip
-
-    elif not op12:
-        return op11(op10(op9(op8(op7(op6(op5(op4(op3(op2(op1(op0(value))))))))))))  # fmt: skip
-
-    elif not op13:
-        return op12(op11(op10(op9(op8(op7(op6(op5(op4(op3(op2(op1(op0(value)))))))))))))  # fmt: skip
-
-    elif not op14:
-        return op13(op12(op11(op10(op9(op8(op7(op6(op5(op4(op3(op2(op1(op0(value))))))))))))))  # fmt: skip
-
-    elif not op15:
-        return op14(op13(op12(op11(op10(op9(op8(op7(op6(op5(op4(op3(op2(op1(op0(value)))))))))))))))  # fmt: skip
-
-    elif not op16:
-        return op15(op14(op13(op12(op11(op10(op9(op8(op7(op6(op5(op4(op3(op2(op1(op0(value))))))))))))))))  # fmt: skip
-
-    elif not op17:
-        return op16(op15(op14(op13(op12(op11(op10(op9(op8(op7(op6(op5(op4(op3(op2(op1(op0(value)))))))))))))))))  # fmt: skip
 
-    elif not op18:
-        return op17(op16(op15(op14(op13(op12(op11(op10(op9(op8(op7(op6(op5(op4(op3(op2(op1(op0(value))))))))))))))))))  # fmt: skip
+def _pipeline_builders(limit: int) -> Tuple[Callable[..., Callable[..., Any]], ...]:
+    """
+    Make the functions that composite a tuple of functions
+    into a single function, for each length up to `limit`.
+    The returned functions are a direct nested call of the functions,
+    so there is no checking of how many functions there are
+    when the pipeline is called.
+    All the lengths are generated and compiled as a single source.
+    """
+    lines = []
+    for length in range(1, limit + 1):
+        params = "".join(f"op{n}, " for n in range(length))
+        call = (
+            "".join(f"op{n}(" for n in reversed(range(length)))
+            + "*args, **kwargs"
+            + ")" * length
+        )
+        lines += [
+            f"def _build{length}(ops):",
+            f"    {params}= ops",
+            # the functions stay closure variables: binding them as keyword
+            # defaults instead measured slower, as the defaults are
+            # filled in on every call.
+            # *args and **kwargs are needed as pipeline passes all
+            # its arguments on to the first function
+            f"    def _inner(*args, **kwargs):",
+            f"        return {call}",
+            f"    return _inner",
+        ]
+    namespace: Dict[str, Any] = {}
+    exec(compile("\n".join(lines), "<pipeline>", "exec"), namespace)
+    return tuple(namespace[f"_build{length}"] for length in range(1, limit + 1))
+
+
+# The pipeline builders, indexed by the number of functions less one
+_BUILDERS = _pipeline_builders(20)
+
+# The ids of the code of the functions the builders return.
+# A pipeline is a function with one of these as its code,
+# which, unlike an attribute, other callables can't claim by accident.
+# The code objects live as long as the builders, so the ids stay valid.
+_PIPELINE_CODE_IDS = frozenset(
+    id(const)
+    for build in _BUILDERS
+    for const in build.__code__.co_consts
+    if isinstance(const, CodeType)
+)
 
-    elif not op19:
-        return op18(op17(op16(op15(op14(op13(op12(op11(op10(op9(op8(op7(op6(op5(op4(op3(op2(op1(op0(value)))))))))))))))))))  # fmt: skip
 
-    else:
-        return op19(op18(op17(op16(op15(op14(op13(op12(op11(op10(op9(op8(op7(op6(op5(op4(op3(op2(op1(op0(value))))))))))))))))))))  # fmt: skip
-
-
-@overload
-def pipeline(op0: Callable[..., Out0], /) -> Callable[..., Out0]:
-    ...
-
-
-@overload
-def pipeline(
-    op0: Callable[..., Out0], op1: Callable[[Out0], Out1], /
-) -> Callable[..., Out1]:
-    ...
-
-
-@overload
-def pipeline(
-    op0: Callable[..., Out0],
-    op1: Callable[[Out0], Out1],
-    op2: Callable[[Out1], Out2],
-    /,
-) -> Callable[..., Out2]:
-    ...
-
-
-@overload
-def pipeline(
-    op0: Callable[..., Out0],
-    op1: Callable[[Out0], Out1],
-    op2: Callable[[Out1], Out2],
-    op3: Callable[[Out2], Out3],
-    /,
-) -> Callable[..., Out3]:
-    ...
-
-
-@overload
-def pipeline(
-    op0: Callable[..., Out0],
-    op1: Callable[[Out0], Out1],
-    op2: Callable[[Out1], Out2],
-    op3: Callable[[Out2], Out3],
-    op4: Callable[[Out3], Out4],
-    /,
-) -> Callable[..., Out4]:
-    ...
-
-
-@overload
-def pipeline(
-    op0: Callable[..., Out0],
-    op1: Callable[[Out0], Out1],
-    op2: Callable[[Out1], Out2],
-    op3: Callable[[Out2], Out3],
-    op4: Callable[[Out3], Out4],
-    op5: Callable[[Out4], Out5],
-    /,
-) -> Callable[..., Out5]:
-    ...
-
-
-@overload
-def pipeline(
-    op0: Callable[..., Out0],
-    op1: Callable[[Out0], Out1],
-    op2: Callable[[Out1], Out2],
-    op3: Callable[[Out2], Out3],
-    op4: Callable[[Out3], Out4],
-    op5: Callable[[Out4], Out5],
-    op6: Callable[[Out5], Out6],
-    /,
-) -> Callable[..., Out6]:
-    ...
-
-
-@overload
-def pipeline(
-    op0: Callable[..., Out0],
-    op1: Callable[[Out0], Out1],
-    op2: Callable[[Out1], Out2],
-    op3: Callable[[Out2], Out3],
-    op4: Callable[[Out3], Out4],
-    op5: Callable[[Out4], Out5],
-    op6: Callable[[Out5], Out6],
-    op7: Callable[[Out6], Out7],
-    /,
-) -> Callable[..., Out7]:
-    ...
-
-
-@overload
-def pipeline(
-    op0: Callable[..., Out0],
-    op1: Callable[[Out0], Out1],
-    op2: Callable[[Out1], Out2],
-    op3: Callable[[Out2], Out3],
-    op4: Callable[[Out3], Out4],
-    op5: Callable[[Out4], Out5],
-    op6: Callable[[Out5], Out6],
-    op7: Callable[[Out6], Out7],
-    op8: Callable[[Out7], Out8],
-    /,
-) -> Callable[..., Out8]:
-    ...
-
-
-@overload
-def pipeline(
-    op0: Callable[..., Out0],
-    op1: Callable[[Out0], Out1],
-    op2: Callable[[Out1], Out2],
-    op3: Callable[[Out2], Out3],
-    op4: Callable[[Out3], Out4],
-    op5: Callable[[Out4], Out5],
-    op6: Callable[[Out5], Out6],
-    op7: Callable[[Out6], Out7],
-    op8: Callable[[Out7], Out8],
-    op9: Callable[[Out8], Out9],
-    /,
-) -> Callable[..., Out9]:
-    ...
-
-
-@overload
-def pipeline(
-    op0: Callable[..., Out0],
-    op1: Callable[[Out0], Out1],
-    op2: Callable[[Out1], Out2],
-    op3: Callable[[Out2], Out3],
-    op4: Callable[[Out3], Out4],
-    op5: Callable[[Out4], Out5],
-    op6: Callable[[Out5], Out6],
-    op7: Callable[[Out6], Out7],
-    op8: Callable[[Out7], Out8],
-    op9: Callable[[Out8], Out9],
-    op10: Callable[[Out9], Out10],
-    /,
-) -> Callable[..., Out10]:
-    ...
-
-
-@overload
-def pipeline(
-    op0: Callable[..., Out0],
-    op1: Callable[[Out0], Out1],
-    op2: Callable[[Out1], Out2],
-    op3: Callable[[Out2], Out3],
-    op4: Callable[[Out3], Out4],
-    op5: Callable[[Out4], Out5],
-    op6: Callable[[Out5], Out6],
-    op7: Callable[[Out6], Out7],
-    op8: Callable[[Out7], Out8],
-    op9: Callable[[Out8], Out9],
-    op10: Callable[[Out9], Out10],
-    op11: Callable[[Out10], Out11],
-    /,
-) -> Callable[..., Out11]:
-    ...
-
-
-@overload
-def pipeline(
-    op0: Callable[..., Out0],
-    op1: Callable[[Out0], Out1],
-    op2: Callable[[Out1], Out2],
-    op3: Callable[[Out2], Out3],
-    op4: Callable[[Out3], Out4],
-    op5: Callable[[Out4], Out5],
-    op6: Callable[[Out5], Out6],
-    op7: Callable[[Out6], Out7],
-    op8: Callable[[Out7], Out8],
-    op9: Callable[[Out8], Out9],
-    op10: Callable[[Out9], Out10],
-    op11: Callable[[Out10], Out11],
-    op12: Callable[[Out11], Out12],
-    /,
-) -> Callable[..., Out12]:
-    ...
-
-
-@overload
-def pipeline(
-    op0: Callable[..., Out0],
-    op1: Callable[[Out0], Out1],
-    op2: Callable[[Out1], Out2],
-    op3: Callable[[Out2], Out3],
-    op4: Callable[[Out3], Out4],
-    op5: Callable[[Out4], Out5],
-    op6: Callable[[Out5], Out6],
-    op7: Callable[[Out6], Out7],
-    op8: Callable[[Out7], Out8],
-    op9: Callable[[Out8], Out9],
-    op10: Callable[[Out9], Out10],
-    op11: Callable[[Out10], Out11],
-    op12: Callable[[Out11], Out12],
-    op13: Callable[[Out12], Out13],
-    /,
-) -> Callable[..., Out13]:
-    ...
-
-
-@overload
-def pipeline(
-    op0: Callable[..., Out0],
-    op1: Callable[[Out0], Out1],
-    op2: Callable[[Out1], Out2],
-    op3: Callable[[Out2], Out3],
-    op4: Callable[[Out3], Out4],
-    op5: Callable[[Out4], Out5],
-    op6: Callable[[Out5], Out6],
-    op7: Callable[[Out6], Out7],
-    op8: Callable[[Out7], Out8],
-    op9: Callable[[Out8], Out9],
-    op10: Callable[[Out9], Out10],
-    op11: Callable[[Out10], Out11],
-    op12: Callable[[Out11], Out12],
-    op13: Callable[[Out12], Out13],
-    op14: Callable[[Out13], Out14],
-    /,
-) -> Callable[..., Out14]:
-    ...
-
-
-@overload
-def pipeline(
-    op0: Callable[..., Out0],
-    op1: Callable[[Out0], Out1],
-    op2: Callable[[Out1], Out2],
-    op3: Callable[[Out2], Out3],
-    op4: Callable[[Out3], Out4],
-    op5: Callable[[Out4], Out5],
-    op6: Callable[[Out5], Out6],
-    op7: Callable[[Out6], Out7],
-    op8: Callable[[Out7], Out8],
-    op9: Callable[[Out8], Out9],
-    op10: Callable[[Out9], Out10],
-    op11: Callable[[Out10], Out11],
-    op12: Callable[[Out11], Out12],
-    op13: Callable[[Out12], Out13],
-    op14: Callable[[Out13], Out14],
-    op15: Callable[[Out14], Out15],
-    /,
-) -> Callable[..., Out15]:
-    ...
-
-
-@overload
-def pipeline(
-    op0: Callable[..., Out0],
-    op1: Callable[[Out0], Out1],
-    op2: Callable[[Out1], Out2],
-    op3: Callable[[Out2], Out3],
-    op4: Callable[[Out3], Out4],
-    op5: Callable[[Out4], Out5],
-    op6: Callable[[Out5], Out6],
-    op7: Callable[[Out6], Out7],
-    op8: Callable[[Out7], Out8],
-    op9: Callable[[Out8], Out9],
-    op10: Callable[[Out9], Out10],
-    op11: Callable[[Out10], Out11],
-    op12: Callable[[Out11], Out12],
-    op13: Callable[[Out12], Out13],
-    op14: Callable[[Out13], Out14],
-    op15: Callable[[Out14], Out15],
-    op16: Callable[[Out15], Out16],
-    /,
-) -> Callable[..., Out16]:
-    ...
-
-
-@overload
-def pipeline(
-    op0: Callable[..., Out0],
-    op1: Callable[[Out0], Out1],
-    op2: Callable[[Out1], Out2],
-    op3: Callable[[Out2], Out3],
-    op4: Callable[[Out3], Out4],
-    op5: Callable[[Out4], Out5],
-    op6: Callable[[Out5], Out6],
-    op7: Callable[[Out6], Out7],
-    op8: Callable[[Out7], Out8],
-    op9: Callable[[Out8], Out9],
-    op10: Callable[[Out9], Out10],
-    op11: Callable[[Out10], Out11],
-    op12: Callable[[Out11], Out12],
-    op13: Callable[[Out12], Out13],
-    op14: Callable[[Out13], Out14],
-    op15: Callable[[Out14], Out15],
-    op16: Callable[[Out15], Out16],
-    op17: Callable[[Out16], Out17],
-    /,
-) -> Callable[..., Out17]:
-    ...
-
-
-@overload
-def pipeline(
-    op0: Callable[..., Out0],
-    op1: Callable[[Out0], Out1],
-    op2: Callable[[Out1], Out2],
-    op3: Callable[[Out2], Out3],
-    op4: Callable[[Out3], Out4],
-    op5: Callable[[Out4], Out5],
-    op6: Callable[[Out5], Out6],
-    op7: Callable[[Out6], Out7],
-    op8: Callable[[Out7], Out8],
-    op9: Callable[[Out8], Out9],
-    op10: Callable[[Out9], Out10],
-    op11: Callable[[Out10], Out11],
-    op12: Callable[[Out11], Out12],
-    op13: Callable[[Out12], Out13],
-    op14: Callable[[Out13], Out14],
-    op15: Callable[[Out14], Out15],
-    op16: Callable[[Out15], Out16],
-    op17: Callable[[Out16], Out17],
-    op18: Callable[[Out17], Out18],
-    /,
-) -> Callable[..., Out18]:
-    ...
-
-
-def pipeline(op0: Callable[..., Out0], op1: Union[Callable[[Out0], Out1], None] = None, op2: Union[Callable[[Out1], Out2], None] = None, op3: Union[Callable[[Out2], Out3], None] = None, op4: Union[Callable[[Out3], Out4], None] = None, op5: Union[Callable[[Out4], Out5], None] = None, op6: Union[Callable[[Out5], Out6], None] = None, op7: Union[Callable[[Out6], Out7], None] = None, op8: Union[Callable[[Out7], Out8], None] = None, op9: Union[Callable[[Out8], Out9], None] = None, op10: Union[Callable[[Out9], Out10], None] = None, op11: Union[Callable[[Out10], Out11], None] = None, op12: Union[Callable[[Out11], Out12], None] = None, op13: Union[Callable[[Out12], Out13], None] = None, op14: Union[Callable[[Out13], Out14], None] = None, op15: Union[Callable[[Out14], Out15], None] = None, op16: Union[Callable[[Out15], Out16], None] = None, op17: Union[Callable[[Out16], Out17], None] = None, op18: Union[Callable[[Out17], Out18], None] = None, op19: Union[Callable[[Out18], Out19], None] = None, /) -> Callable[..., Any]:  # type: ignore
+def _pipeline_ops(func: Callable[..., Any]) -> Tuple[Callable[..., Any], ...]:
+    """
+    Get the functions that make up a function, which is just the
+    function itself unless it is a pipeline.
+    Pipelines in a pipeline (the chunks of a long one)
+    are expanded in turn.
+    """
+    if type(func) is not FunctionType or id(func.__code__) not in _PIPELINE_CODE_IDS:
+        return (func,)
+    # the closure holds op0 to opN, in the order of co_freevars
+    cells: Dict[str, Any] = dict(zip(func.__code__.co_freevars, func.__closure__))  # type: ignore
+    return tuple(
+        op
+        for n in range(len(cells))
+        for op in _pipeline_ops(cells[f"op{n}"].cell_contents)
+    )
+
+
+def _composite(ops: Tuple[Callable[..., Any], ...]) -> Callable[..., Any]:
+    """
+    Composite any number of functions into a single function.
+    Past 20 functions, they are composited in chunks of 20,
+    and the chunks composited together.
+    """
+    if len(ops) <= 20:
+        return _BUILDERS[len(ops) - 1](ops)
+    chunks = tuple(
+        _composite(ops[start : start + 20]) for start in range(0, len(ops), 20)
+    )
+    return _composite(chunks)
+
+
+if TYPE_CHECKING:
+
+    @overload
+    def pipeline(op0: Callable[..., Out0], /) -> Callable[..., Out0]:
+        ...
+
+    @overload
+    def pipeline(
+        op0: Callable[..., Out0], op1: Callable[[Out0], Out1], /
+    ) -> Callable[..., Out1]:
+        ...
+
+    @overload
+    def pipeline(
+        op0: Callable[..., Out0],
+        op1: Callable[[Out0], Out1],
+        op2: Callable[[Out1], Out2],
+        /,
+    ) -> Callable[..., Out2]:
+        ...
+
+    @overload
+    def pipeline(
+        op0: Callable[..., Out0],
+        op1: Callable[[Out0], Out1],
+        op2: Callable[[Out1], Out2],
+        op3: Callable[[Out2], Out3],
+        /,
+    ) -> Callable[..., Out3]:
+        ...
+
+    @overload
+    def pipeline(
+        op0: Callable[..., Out0],
+        op1: Callable[[Out0], Out1],
+        op2: Callable[[Out1], Out2],
+        op3: Callable[[Out2], Out3],
+        op4: Callable[[Out3], Out4],
+        /,
+    ) -> Callable[..., Out4]:
+        ...
+
+    @overload
+    def pipeline(
+        op0: Callable[..., Out0],
+        op1: Callable[[Out0], Out1],
+        op2: Callable[[Out1], Out2],
+        op3: Callable[[Out2], Out3],
+        op4: Callable[[Out3], Out4],
+        op5: Callable[[Out4], Out5],
+        /,
+    ) -> Callable[..., Out5]:
+        ...
+
+    @overload
+    def pipeline(
+        op0: Callable[..., Out0],
+        op1: Callable[[Out0], Out1],
+        op2: Callable[[Out1], Out2],
+        op3: Callable[[Out2], Out3],
+        op4: Callable[[Out3], Out4],
+        op5: Callable[[Out4], Out5],
+        op6: Callable[[Out5], Out6],
+        /,
+    ) -> Callable[..., Out6]:
+        ...
+
+    @overload
+    def pipeline(
+        op0: Callable[..., Out0],
+        op1: Callable[[Out0], Out1],
+        op2: Callable[[Out1], Out2],
+        op3: Callable[[Out2], Out3],
+        op4: Callable[[Out3], Out4],
+        op5: Callable[[Out4], Out5],
+        op6: Callable[[Out5], Out6],
+        op7: Callable[[Out6], Out7],
+        /,
+    ) -> Callable[..., Out7]:
+        ...
+
+    @overload
+    def pipeline(
+        op0: Callable[..., Out0],
+        op1: Callable[[Out0], Out1],
+        op2: Callable[[Out1], Out2],
+        op3: Callable[[Out2], Out3],
+        op4: Callable[[Out3], Out4],
+        op5: Callable[[Out4], Out5],
+        op6: Callable[[Out5], Out6],
+        op7: Callable[[Out6], Out7],
+        op8: Callable[[Out7], Out8],
+        /,
+    ) -> Callable[..., Out8]:
+        ...
+
+    @overload
+    def pipeline(
+        op0: Callable[..., Out0],
+        op1: Callable[[Out0], Out1],
+        op2: Callable[[Out1], Out2],
+        op3: Callable[[Out2], Out3],
+        op4: Callable[[Out3], Out4],
+        op5: Callable[[Out4], Out5],
+        op6: Callable[[Out5], Out6],
+        op7: Callable[[Out6], Out7],
+        op8: Callable[[Out7], Out8],
+        op9: Callable[[Out8], Out9],
+        /,
+    ) -> Callable[..., Out9]:
+        ...
+
+    @overload
+    def pipeline(
+        op0: Callable[..., Out0],
+        op1: Callable[[Out0], Out1],
+        op2: Callable[[Out1], Out2],
+        op3: Callable[[Out2], Out3],
+        op4: Callable[[Out3], Out4],
+        op5: Callable[[Out4], Out5],
+        op6: Callable[[Out5], Out6],
+        op7: Callable[[Out6], Out7],
+        op8: Callable[[Out7], Out8],
+        op9: Callable[[Out8], Out9],
+        op10: Callable[[Out9], Out10],
+        /,
+    ) -> Callable[..., Out10]:
+        ...
+
+    @overload
+    def pipeline(
+        op0: Callable[..., Out0],
+        op1: Callable[[Out0], Out1],
+        op2: Callable[[Out1], Out2],
+        op3: Callable[[Out2], Out3],
+        op4: Callable[[Out3], Out4],
+        op5: Callable[[Out4], Out5],
+        op6: Callable[[Out5], Out6],
+        op7: Callable[[Out6], Out7],
+        op8: Callable[[Out7], Out8],
+        op9: Callable[[Out8], Out9],
+        op10: Callable[[Out9], Out10],
+        op11: Callable[[Out10], Out11],
+        /,
+    ) -> Callable[..., Out11]:
+        ...
+
+    @overload
+    def pipeline(
+        op0: Callable[..., Out0],
+        op1: Callable[[Out0], Out1],
+        op2: Callable[[Out1], Out2],
+        op3: Callable[[Out2], Out3],
+        op4: Callable[[Out3], Out4],
+        op5: Callable[[Out4], Out5],
+        op6: Callable[[Out5], Out6],
+        op7: Callable[[Out6], Out7],
+        op8: Callable[[Out7], Out8],
+        op9: Callable[[Out8], Out9],
+        op10: Callable[[Out9], Out10],
+        op11: Callable[[Out10], Out11],
+        op12: Callable[[Out11], Out12],
+        /,
+    ) -> Callable[..., Out12]:
+        ...
+
+    @overload
+    def pipeline(
+        op0: Callable[..., Out0],
+        op1: Callable[[Out0], Out1],
+        op2: Callable[[Out1], Out2],
+        op3: Callable[[Out2], Out3],
+        op4: Callable[[Out3], Out4],
+        op5: Callable[[Out4], Out5],
+        op6: Callable[[Out5], Out6],
+        op7: Callable[[Out6], Out7],
+        op8: Callable[[Out7], Out8],
+        op9: Callable[[Out8], Out9],
+        op10: Callable[[Out9], Out10],
+        op11: Callable[[Out10], Out11],
+        op12: Callable[[Out11], Out12],
+        op13: Callable[[Out12], Out13],
+        /,
+    ) -> Callable[..., Out13]:
+        ...
+
+    @overload
+    def pipeline(
+        op0: Callable[..., Out0],
+        op1: Callable[[Out0], Out1],
+        op2: Callable[[Out1], Out2],
+        op3: Callable[[Out2], Out3],
+        op4: Callable[[Out3], Out4],
+        op5: Callable[[Out4], Out5],
+        op6: Callable[[Out5], Out6],
+        op7: Callable[[Out6], Out7],
+        op8: Callable[[Out7], Out8],
+        op9: Callable[[Out8], Out9],
+        op10: Callable[[Out9], Out10],
+        op11: Callable[[Out10], Out11],
+        op12: Callable[[Out11], Out12],
+        op13: Callable[[Out12], Out13],
+        op14: Callable[[Out13], Out14],
+        /,
+    ) -> Callable[..., Out14]:
+        ...
+
+    @overload
+    def pipeline(
+        op0: Callable[..., Out0],
+        op1: Callable[[Out0], Out1],
+        op2: Callable[[Out1], Out2],
+        op3: Callable[[Out2], Out3],
+        op4: Callable[[Out3], Out4],
+        op5: Callable[[Out4], Out5],
+        op6: Callable[[Out5], Out6],
+        op7: Callable[[Out6], Out7],
+        op8: Callable[[Out7], Out8],
+        op9: Callable[[Out8], Out9],
+        op10: Callable[[Out9], Out10],
+        op11: Callable[[Out10], Out11],
+        op12: Callable[[Out11], Out12],
+        op13: Callable[[Out12], Out13],
+        op14: Callable[[Out13], Out14],
+        op15: Callable[[Out14], Out15],
+        /,
+    ) -> Callable[..., Out15]:
+        ...
+
+    @overload
+    def pipeline(
+        op0: Callable[..., Out0],
+        op1: Callable[[Out0], Out1],
+        op2: Callable[[Out1], Out2],
+        op3: Callable[[Out2], Out3],
+        op4: Callable[[Out3], Out4],
+        op5: Callable[[Out4], Out5],
+        op6: Callable[[Out5], Out6],
+        op7: Callable[[Out6], Out7],
+        op8: Callable[[Out7], Out8],
+        op9: Callable[[Out8], Out9],
+        op10: Callable[[Out9], Out10],
+        op11: Callable[[Out10], Out11],
+        op12: Callable[[Out11], Out12],
+        op13: Callable[[Out12], Out13],
+        op14: Callable[[Out13], Out14],
+        op15: Callable[[Out14], Out15],
+        op16: Callable[[Out15], Out16],
+        /,
+    ) -> Callable[..., Out16]:
+        ...
+
+    @overload
+    def pipeline(
+        op0: Callable[..., Out0],
+        op1: Callable[[Out0], Out1],
+        op2: Callable[[Out1], Out2],
+        op3: Callable[[Out2], Out3],
+        op4: Callable[[Out3], Out4],
+        op5: Callable[[Out4], Out5],
+        op6: Callable[[Out5], Out6],
+        op7: Callable[[Out6], Out7],
+        op8: Callable[[Out7], Out8],
+        op9: Callable[[Out8], Out9],
+        op10: Callable[[Out9], Out10],
+        op11: Callable[[Out10], Out11],
+        op12: Callable[[Out11], Out12],
+        op13: Callable[[Out12], Out13],
+        op14: Callable[[Out13], Out14],
+        op15: Callable[[Out14], Out15],
+        op16: Callable[[Out15], Out16],
+        op17: Callable[[Out16], Out17],
+        /,
+    ) -> Callable[..., Out17]:
+        ...
+
+    @overload
+    def pipeline(
+        op0: Callable[..., Out0],
+        op1: Callable[[Out0], Out1],
+        op2: Callable[[Out1], Out2],
+        op3: Callable[[Out2], Out3],
+        op4: Callable[[Out3], Out4],
+        op5: Callable[[Out4], Out5],
+        op6: Callable[[Out5], Out6],
+        op7: Callable[[Out6], Out7],
+        op8: Callable[[Out7], Out8],
+        op9: Callable[[Out8], Out9],
+        op10: Callable[[Out9], Out10],
+        op11: Callable[[Out10], Out11],
+        op12: Callable[[Out11], Out12],
+        op13: Callable[[Out12], Out13],
+        op14: Callable[[Out13], Out14],
+        op15: Callable[[Out14], Out15],
+        op16: Callable[[Out15], Out16],
+        op17: Callable[[Out16], Out17],
+        op18: Callable[[Out17], Out18],
+        /,
+    ) -> Callable[..., Out18]:
+        ...
+
+
+def pipeline(*ops: Callable[..., Any]) -> Callable[..., Any]:  # type: ignore
     """
     Pipeline takes up to 20 functions and composites them into a single function.
+    The functions are called directly from one generated function,
+    so the pipeline only adds a single call for the whole chain.
+    Pipelines passed in are replaced by their own functions,
+    so nesting pipelines only adds calls past 20 functions in total.
     """
-
-    if not op1:
-
-        def _inner0(*args: Any, **kwargs: Any) -> Out0:
-            return op0(*args, **kwargs)  # fmt: skip
-
-        return _inner0
-
-    elif not op2:
-
-        def _inner1(*args: Any, **kwargs: Any) -> Out1:
-            return op1(op0(*args, **kwargs))  # fmt: skip
-
-        return _inner1
-
-    elif not op3:
-
-        def _inner2(*args: Any, **kwargs: Any) -> Out2:
-            return op2(op1(op0(*args, **kwargs)))  # fmt: skip
-
-        return _inner2
-
-    elif not op4:
-
-        def _inner3(*args: Any, **kwargs: Any) -> Out3:
-            return op3(op2(op1(op0(*args, **kwargs))))  # fmt: skip
-
-        return _inner3
-
-    elif not op5:
-
-        def _inner4(*args: Any, **kwargs: Any) -> Out4:
-            return op4(op3(op2(op1(op0(*args, **kwargs)))))  # fmt: skip
-
-        return _inner4
-
-    elif not op6:
-
-        def _inner5(*args: Any, **kwargs: Any) -> Out5:
-            return op5(op4(op3(op2(op1(op0(*args, **kwargs))))))  # fmt: skip
-
-        return _inner5
-
-    elif not op7:
-
-        def _inner6(*args: Any, **kwargs: Any) -> Out6:
-            return op6(op5(op4(op3(op2(op1(op0(*args, **kwargs)))))))  # fmt: skip
-
-        return _inner6
-
-    elif not op8:
-
-        def _inner7(*args: Any, **kwargs: Any) -> Out7:
-            return op7(op6(op5(op4(op3(op2(op1(op0(*args, **kwargs))))))))  # fmt: skip
-
-        return _inner7
-
-    elif not op9:
-
-        def _inner8(*args: Any, **kwargs: Any) -> Out8:
-            return op8(op7(op6(op5(op4(op3(op2(op1(op0(*args, **kwargs)))))))))  # fmt: skip
-
-        return _inner8
-
-    elif not op10:
-
-        def _inner9(*args: Any, **kwargs: Any) -> Out9:
-            return op9(op8(op7(op6(op5(op4(op3(op2(op1(op0(*args, **kwargs))))))))))  # fmt: skip
-
-        return _inner9
-
-    elif not op11:
-
-        def _inner10(*args: Any, **kwargs: Any) -> Out10:
-            return op10(op9(op8(op7(op6(op5(op4(op3(op2(op1(op0(*args, **kwargs)))))))))))  # fmt: skip
-
-        return _inner10
-
-    elif not op12:
-
-        def _inner11(*args: Any, **kwargs: Any) -> Out11:
-            return op11(op10(op9(op8(op7(op6(op5(op4(op3(op2(op1(op0(*args, **kwargs))))))))))))  # fmt: skip
-
-        return _inner11
-
-    elif not op13:
-
-        def _inner12(*args: Any, **kwargs: Any) -> Out12:
-            return op12(op11(op10(op9(op8(op7(op6(op5(op4(op3(op2(op1(op0(*args, **kwargs)))))))))))))  # fmt: skip
-
-        return _inner12
-
-    elif not op14:
-
-        def _inner13(*args: Any, **kwargs: Any) -> Out13:
-            return op13(op12(op11(op10(op9(op8(op7(op6(op5(op4(op3(op2(op1(op0(*args, **kwargs))))))))))))))  # fmt: skip
-
-        return _inner13
-
-    elif not op15:
-
-        def _inner14(*args: Any, **kwargs: Any) -> Out14:
-            return op14(op13(op12(op11(op10(op9(op8(op7(op6(op5(op4(op3(op2(op1(op0(*args, **kwargs)))))))))))))))  # fmt: skip
-
-        return _inner14
-
-    elif not op16:
-
-        def _inner15(*args: Any, **kwargs: Any) -> Out15:
-            return op15(op14(op13(op12(op11(op10(op9(op8(op7(op6(op5(op4(op3(op2(op1(op0(*args, **kwargs))))))))))))))))  # fmt: skip
-
-        return _inner15
-
-    elif not op17:
-
-        def _inner16(*args: Any, **kwargs: Any) -> Out16:
-            return op16(op15(op14(op13(op12(op11(op10(op9(op8(op7(op6(op5(op4(op3(op2(op1(op0(*args, **kwargs)))))))))))))))))  # fmt: skip
-
-        return _inner16
-
-    elif not op18:
-
-        def _inner17(*args: Any, **kwargs: Any) -> Out17:
-            return op17(op16(op15(op14(op13(op12(op11(op10(op9(op8(op7(op6(op5(op4(op3(op2(op1(op0(*args, **kwargs))))))))))))))))))  # fmt: skip
-
-        return _inner17
-
-    elif not op19:
-
-        def _inner18(*args: Any, **kwargs: Any) -> Out18:
-            return op18(op17(op16(op15(op14(op13(op12(op11(op10(op9(op8(op7(op6(op5(op4(op3(op2(op1(op0(*args, **kwargs)))))))))))))))))))  # fmt: skip
-
-        return _inner18
-
-    else:
-
-        def _inner19(*args: Any, **kwargs: Any) -> Out19:
-            return op19(op18(op17(op16(op15(op14(op13(op12(op11(op10(op9(op8(op7(op6(op5(op4(op3(op2(op1(op0(*args, **kwargs))))))))))))))))))))  # fmt: skip
-
-        return _inner19
+    if not 0 < len(ops) <= 20:
+        raise TypeError(
+            f"pipeline takes from 1 to 20 functions but {len(ops)} were given"
+        )
+    for op in ops:
+        # the same check as _pipeline_ops, inlined to keep
+        # building pipelines without nested ones cheap
+        if type(op) is FunctionType and id(op.__code__) in _PIPELINE_CODE_IDS:
+            return _composite(
+                tuple(func for nested in ops for func in _pipeline_ops(nested))
+            )
+    # building is a tuple index and one closure, which measured faster
+    # than looking up a cache of pipelines keyed on the function ids
+    return _BUILDERS[len(ops) - 1](ops)
 
 
 def arbitary_length_pipe(value: Any, *funcs: Callable[[Any], Any]) -> Any:
     """
     Pipe that takes an arbitary amount of functions.
     """
+    # a plain loop measured faster than handing short chains to pipe
+    # or using functools.reduce, at every length
     for func in funcs:
         value = func(value)
     return value
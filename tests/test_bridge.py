@@ -1,6 +1,6 @@
 from re import A
 
-from function_pipes import pipe, pipe_bridge
+from function_pipes import fast_pipes, pipe, pipe_bridge
 
 
 def test_bridge():
@@ -18,3 +18,82 @@ def test_bridge():
 
     assert v == "3", "value has passed through"
     assert n == 3, "function also received the value"
+
+
+bridged_values = []
+
+
+@fast_pipes
+def fast_bridge():
+    return pipe(
+        1, lambda x: x + x, pipe_bridge(bridged_values.append), lambda x: x * x, str
+    )
+
+
+def test_fast_bridge():
+    """
+    test the pipe bridge is expanded by fast_pipes
+    """
+    bridged_values.clear()
+
+    assert fast_bridge() == "4", "value has passed through"
+    assert bridged_values == [2], "function also received the value"
+    assert "pipe_bridge" not in fast_bridge.__code__.co_names, "bridge was expanded"
+
+
+@fast_pipes
+def fast_bridge_in_comprehension():
+    return [y for y in pipe([1, 2], pipe_bridge(bridged_values.append), list)]
+
+
+def test_fast_bridge_in_comprehension():
+    """
+    test a bridge still works where a walrus isn't allowed
+    """
+    bridged_values.clear()
+
+    assert fast_bridge_in_comprehension() == [1, 2], "value has passed through"
+    assert bridged_values == [[1, 2]], "function also received the value"
+
+
+@fast_pipes
+def fast_bridge_in_class_comprehension():
+    class Values:
+        values = [pipe(y, pipe_bridge(bridged_values.append), str) for y in [1, 2]]
+
+    return Values.values
+
+
+def test_fast_bridge_in_class_comprehension():
+    """
+    test a bridge still works in a comprehension in a class body
+    """
+    bridged_values.clear()
+
+    assert fast_bridge_in_class_comprehension() == ["1", "2"]
+    assert bridged_values == [1, 2]
+
+
+@fast_pipes
+def fast_bridge_in_nested_pipe(x: int, y: int):
+    return pipe(x, lambda a: (a, pipe(y, pipe_bridge(bridged_values.append)), a))
+
+
+@fast_pipes
+def fast_bridge_in_nested_pipe_expression(x: int):
+    return pipe(
+        x,
+        lambda a: a + pipe(a * 10, pipe_bridge(bridged_values.append), lambda b: b) + a,
+    )
+
+
+def test_fast_bridge_in_nested_pipe():
+    """
+    test a bridge in a nested pipe doesn't overwrite the outer
+    lambda's value
+    """
+    bridged_values.clear()
+
+    assert fast_bridge_in_nested_pipe(1, 2) == (1, 2, 1)
+    assert fast_bridge_in_nested_pipe_expression(1) == 12
+    assert bridged_values == [2, 10]
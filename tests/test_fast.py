@@ -1,5 +1,11 @@
+import functools
+import importlib
+import sys
+from pathlib import Path
 from typing import Any
 
+import function_pipes
+import pytest
 from function_pipes import fast_pipes, pipe
 
 
@@ -61,3 +67,163 @@ def test_pipe_lambda_equiv_multiple():
         pipe_version_with_lambda_used_more_than_once()
         == raw_version_with_function_used_more_than_once()
     ), "fast_pipe version is not equivalent to raw version when lambda value is used multiple times"
+
+
+@fast_pipes
+def fast_version_with_lambda_used_more_than_once():
+    return pipe(12, add_one, times_twelve, lambda x: x + x + 2)
+
+
+@fast_pipes
+def fast_version_with_lambda_args_used_more_than_once():
+    return pipe(12, add_one, lambda x: max(x, x + 1, x), times_twelve)
+
+
+def test_fast_lambda_equiv_multiple():
+    v = times_twelve(add_one(12))
+    assert fast_version_with_lambda_used_more_than_once() == v + v + 2
+    assert fast_version_with_lambda_args_used_more_than_once() == times_twelve(
+        max(13, 14, 13)
+    )
+
+
+def pipe_version_undecorated():
+    return pipe(12, add_one, times_twelve)
+
+
+def test_fast_pipes_reuses_compiled_code(monkeypatch: pytest.MonkeyPatch):
+    first = fast_pipes(pipe_version_undecorated)
+
+    def fail_getsource(*args: Any):
+        raise AssertionError("source should not be read again")
+
+    module = sys.modules[fast_pipes.__module__]
+    monkeypatch.setattr(module, "getsource", fail_getsource)
+    second = fast_pipes(pipe_version_undecorated)
+
+    assert first() == second() == add_one(12) * 12
+
+
+def test_fast_pipes_reload_reuses_compiled_code(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+):
+    (tmp_path / "reloaded_pipes.py").write_text(
+        "from function_pipes import fast_pipes, pipe\n"
+        "\n"
+        "@fast_pipes\n"
+        "def func():\n"
+        "    return pipe(12, str)\n"
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+    module = importlib.import_module("reloaded_pipes")
+
+    def fail_getsource(*args: Any):
+        raise AssertionError("source should not be read again")
+
+    monkeypatch.setattr(sys.modules[fast_pipes.__module__], "getsource", fail_getsource)
+    module = importlib.reload(module)
+    assert module.func() == "12"
+
+
+def test_fast_pipes_reload_recompiles_edited_defaults(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+):
+    path = tmp_path / "edited_pipes.py"
+    source = (
+        "from function_pipes import fast_pipes, pipe\n"
+        "\n"
+        "@fast_pipes\n"
+        "def func(x, n=1):\n"
+        "    return pipe(x, lambda y: y + n)\n"
+    )
+    path.write_text(source)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    module = importlib.import_module("edited_pipes")
+    assert module.func(10) == 11
+
+    # the code object of func is unchanged, but the definition isn't
+    path.write_text(source.replace("n=1", "n=20"))
+    module = importlib.reload(module)
+    assert module.func(10) == 30
+
+
+@functools.lru_cache
+@function_pipes.fast_pipes
+def fast_version_with_attribute_decorators():
+    return pipe(12, add_one, times_twelve)
+
+
+@functools.lru_cache(maxsize=None)
+@fast_pipes
+def fast_version_with_method_calls():
+    return pipe("12", str.strip, lambda x: x.zfill(4), int)
+
+
+def test_fast_pipes_attribute_decorators():
+    assert fast_version_with_attribute_decorators() == times_twelve(add_one(12))
+    # the decorator above fast_pipes is applied once, to the rewritten function
+    assert hasattr(fast_version_with_attribute_decorators, "cache_info")
+    assert not hasattr(fast_version_with_attribute_decorators.__wrapped__, "cache_info")
+
+
+def no_pipe_version():
+    return add_one(12)
+
+
+def test_fast_pipes_without_pipe():
+    assert fast_pipes(no_pipe_version) is no_pipe_version
+
+
+def test_fast_pipes_method_calls():
+    assert fast_version_with_method_calls() == 12
+
+
+@fast_pipes
+def fast_version_with_annotations(value: int) -> str:
+    return pipe(value, add_one, str)
+
+
+def test_fast_pipes_compiles_with_own_module_features():
+    # this module doesn't postpone annotations, so neither should
+    # the rewritten function
+    assert fast_version_with_annotations.__annotations__["value"] is int
+    assert fast_version_with_annotations(1) == "2"
+
+
+@fast_pipes
+def fast_version_with_shadowing_lambda():
+    return pipe(12, lambda x: (lambda x, y=x: x + y)(x * 2))
+
+
+def test_fast_pipes_shadowing_lambda():
+    # the inner x is the inner lambda's own parameter,
+    # but the default is taken from the outer one
+    assert fast_version_with_shadowing_lambda() == 36
+
+
+@fast_pipes
+def fast_version_with_nested_multiple_uses(x: int, y: int):
+    return pipe(x, lambda a: (a, pipe(y, lambda b: b + b), a))
+
+
+@fast_pipes
+def fast_version_with_first_use_in_nested_lambda(value: int):
+    return pipe(value, lambda x: (lambda y: x + y)(1) + x)
+
+
+@fast_pipes
+def fast_version_with_first_use_in_condition(value: int):
+    return pipe(value, lambda x: (value > 5 and x) or x + 1)
+
+
+def test_fast_pipes_nested_multiple_uses():
+    # each lambda has its own temporary variable
+    assert fast_version_with_nested_multiple_uses(1, 2) == (1, 4, 1)
+
+
+def test_fast_pipes_first_use_not_evaluated_first():
+    # the first use isn't certain to run before the others,
+    # so the lambda is called instead
+    assert fast_version_with_first_use_in_nested_lambda(1) == 3
+    assert fast_version_with_first_use_in_condition(1) == 2
+    assert fast_version_with_first_use_in_condition(10) == 10
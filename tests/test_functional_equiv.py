@@ -1,7 +1,11 @@
 import random
+import typing
 from typing import Any, Callable
+from unittest.mock import MagicMock
 
-from function_pipes import pipe
+import function_pipes
+import pytest
+from function_pipes import pipe, pipeline
 
 pipe_allowed_size = 20
 
@@ -70,3 +74,83 @@ def test_equiv_function():
         result_basic = basic_pipe(random_number, *random_funcs)
         # assert the results are the same
         assert result == result_basic, f"mismatch for {n}"
+
+
+def test_equiv_pipeline():
+    """
+    test the pipeline function works the same as the basic_pipe function
+    """
+    funcs = [add_one, times_ten, divide_by_two]
+
+    for n in range(1, pipe_allowed_size + 1):
+        random_funcs = [random.choice(funcs) for _ in range(n)]
+        random_number = random.randint(0, 100)
+        result = pipeline(*random_funcs)(random_number)
+        result_basic = basic_pipe(random_number, *random_funcs)
+        assert result == result_basic, f"mismatch for {n}"
+
+
+def test_pipeline_passes_arguments_to_first_function():
+    """
+    test all arguments given to the pipeline reach the first function
+    """
+    func = pipeline(lambda x, y=1: x + y, times_ten)
+    assert func(1, y=2) == 30
+    assert func(1) == 20
+
+
+def test_pipeline_length_limit():
+    """
+    test the pipeline rejects more functions than it can be typed for
+    """
+    with pytest.raises(TypeError):
+        pipeline()  # type: ignore
+    with pytest.raises(TypeError):
+        pipeline(*[add_one] * (pipe_allowed_size + 1))
+
+
+def test_nested_pipelines_are_flattened():
+    """
+    test pipelines passed to a pipeline are replaced by their functions
+    """
+    inner = pipeline(lambda x, y=1: x + y, times_ten)
+    func = pipeline(inner, divide_by_two, inner)
+    assert func(1, y=2) == 160
+    # the inner pipeline isn't called, its functions are
+    assert inner not in [cell.cell_contents for cell in func.__closure__]  # type: ignore
+
+
+def test_nested_pipelines_past_length_limit():
+    """
+    test nesting pipelines can composite more functions than the limit
+    """
+    full = pipeline(*[add_one] * pipe_allowed_size)
+    func = pipeline(full, full, times_ten)
+    assert func(0) == pipe_allowed_size * 2 * 10
+    assert (
+        pipeline(func, func)(0)
+        == (pipe_allowed_size * 2 * 10 + pipe_allowed_size * 2) * 10
+    )
+
+
+def test_pipeline_keeps_objects_with_any_attribute():
+    """
+    test callables that claim to have every attribute
+    aren't mistaken for pipelines
+    """
+    assert pipeline(MagicMock(return_value=5), str)(1) == "5"
+
+
+def test_public_type_hints_resolve():
+    """
+    test the annotations of the public functions can be evaluated at runtime
+    """
+    for name in [
+        "pipe",
+        "pipeline",
+        "pipe_bridge",
+        "fast_pipes",
+        "arbitary_length_pipe",
+    ]:
+        assert name in function_pipes.__all__
+        typing.get_type_hints(getattr(function_pipes, name))
@@ -28,3 +28,12 @@ def test_versions_are_in_sync():
     package_init_version = package.__version__
 
     assert package_init_version == pyproject_version
+
+
+def test_module_versions_are_in_sync():
+    """Checks the generated modules have the same __version__ as the package."""
+    from function_pipes.with_paramspec import function_pipes as with_paramspec
+    from function_pipes.without_paramspec import function_pipes as without_paramspec
+
+    assert with_paramspec.__version__ == package.__version__
+    assert without_paramspec.__version__ == package.__version__
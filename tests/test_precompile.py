@@ -0,0 +1,98 @@
+import importlib
+import sys
+from pathlib import Path
+from typing import Any
+
+import pytest
+from function_pipes import fast_pipes
+from function_pipes.precompile import precompile
+
+module_source = """
+from function_pipes import fast_pipes, pipe
+
+
+@fast_pipes
+def func():
+    return pipe(12, lambda x: x + 1, str)
+
+
+@fast_pipes
+def with_default(n=1):
+    return pipe(n, lambda x: x + 1, str)
+"""
+
+
+@pytest.fixture
+def pipes_module(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    """
+    A module using fast_pipes, with fresh fast_pipes caches
+    """
+    pipes = sys.modules[fast_pipes.__module__]
+    monkeypatch.setattr(pipes, "_FAST_PIPE_CACHE", {})
+    monkeypatch.setattr(pipes, "_PRECOMPILED", {})
+    monkeypatch.syspath_prepend(str(tmp_path))
+    path = tmp_path / "precompiled_pipes.py"
+    path.write_text(module_source)
+    yield path
+    sys.modules.pop("precompiled_pipes", None)
+
+
+def fail_getsource(*args: Any):
+    raise AssertionError("source should not be read")
+
+
+def test_precompile_skips_source(pipes_module: Path, monkeypatch: pytest.MonkeyPatch):
+    written = precompile("precompiled_pipes")
+    assert Path(written) == pipes_module.with_suffix(".fastpipes")
+
+    # a fresh import of the module should use the written definitions
+    pipes = sys.modules[fast_pipes.__module__]
+    monkeypatch.setattr(pipes, "_FAST_PIPE_CACHE", {})
+    monkeypatch.setattr(pipes, "getsource", fail_getsource)
+    del sys.modules["precompiled_pipes"]
+    module = importlib.import_module("precompiled_pipes")
+    assert module.func() == "13"
+
+
+def test_precompile_ignores_changed_functions(pipes_module: Path):
+    precompile("precompiled_pipes")
+
+    pipes = sys.modules[fast_pipes.__module__]
+    pipes._FAST_PIPE_CACHE.clear()
+    pipes_module.write_text(module_source.replace("x + 1", "x + 100"))
+    del sys.modules["precompiled_pipes"]
+    module = importlib.import_module("precompiled_pipes")
+    assert module.func() == "112"
+
+
+def test_precompile_ignores_changed_defaults(pipes_module: Path):
+    precompile("precompiled_pipes")
+
+    # the code object is unchanged, but the definition isn't
+    pipes = sys.modules[fast_pipes.__module__]
+    pipes._FAST_PIPE_CACHE.clear()
+    pipes_module.write_text(module_source.replace("n=1", "n=10"))
+    del sys.modules["precompiled_pipes"]
+    module = importlib.import_module("precompiled_pipes")
+    assert module.with_default() == "11"
+
+
+def test_precompile_ignores_other_versions(
+    pipes_module: Path, monkeypatch: pytest.MonkeyPatch
+):
+    precompile("precompiled_pipes")
+
+    # a file written by another version of function_pipes isn't loaded
+    pipes = sys.modules[fast_pipes.__module__]
+    monkeypatch.setattr(pipes, "__version__", "0.0.0")
+    monkeypatch.setattr(pipes, "_FAST_PIPE_CACHE", {})
+    monkeypatch.setattr(pipes, "_PRECOMPILED", {})
+    read = []
+    getsource = pipes.getsource
+    monkeypatch.setattr(
+        pipes, "getsource", lambda func: read.append(func) or getsource(func)
+    )
+    del sys.modules["precompiled_pipes"]
+    module = importlib.import_module("precompiled_pipes")
+    assert module.func() == "13"
+    assert read, "source should be read"